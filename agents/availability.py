@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Müsaitlik Motoru - Birleştirilmiş meşgul aralıklar üzerinde tek geçişli slot tarama
+"""
+
+import heapq
+import math
+import os
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import pytz
+from dateutil.rrule import rrulestr
+
+# NumPy opsiyonel - yalnızca AVAILABILITY_ENGINE=bitmap ile kullanılır
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str):
+    """pytz saat dilimi - her çağrıda yeniden oluşturmamak için önbellekli"""
+    return pytz.timezone(name)
+
+
+TURKEY_TZ = get_timezone('Europe/Istanbul')
+
+# Çalışma saatleri ve slot ayarları
+WORK_START_HOUR = 9
+WORK_END_HOUR = 18
+SLOT_STEP_MINUTES = 30
+MAX_SLOTS = 5
+
+# 'bitmap' -> NumPy bitmap motoru (opsiyonel); ölçümlerde sweep'ten tutarlı hızlı olmadığı için varsayılan 'sweep'
+AVAILABILITY_ENGINE = os.getenv('AVAILABILITY_ENGINE', 'sweep')
+
+# Tekrarlayan toplantılarda kontrol edilecek en fazla tekrar sayısı
+MAX_RECURRENCE_OCCURRENCES = 52
+
+
+@dataclass(frozen=True)
+class WorkingHours:
+    """Katılımcının saat dilimi ve yerel çalışma saatleri"""
+    timezone: str = 'Europe/Istanbul'
+    start: str = f'{WORK_START_HOUR:02d}:00'
+    end: str = f'{WORK_END_HOUR:02d}:00'
+
+
+DEFAULT_WORKING_HOURS = WorkingHours()
+
+# Katılımcı email -> WorkingHours (bilinmiyorsa None); uygulama katmanı kaydeder (ör. hafıza profilleri)
+_working_hours_provider: Optional[Callable[[str], Optional[WorkingHours]]] = None
+
+
+def set_working_hours_provider(provider: Optional[Callable[[str], Optional[WorkingHours]]]):
+    """Katılımcı çalışma saatlerini sağlayan fonksiyonu kaydet"""
+    global _working_hours_provider
+    _working_hours_provider = provider
+
+
+def get_working_hours(emails: Iterable[str]) -> Dict[str, WorkingHours]:
+    """Profili bilinen katılımcıların çalışma saatleri"""
+    if _working_hours_provider is None:
+        return {}
+    working_hours = {}
+    for email in emails:
+        hours = _working_hours_provider(email)
+        if hours is not None:
+            working_hours[email] = hours
+    return working_hours
+
+
+def _parse_iso(value: str) -> datetime:
+    """Google Calendar ISO zamanını timezone bilgili datetime'a çevir"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def to_utc_minutes(value: datetime) -> int:
+    """Timezone bilgili datetime -> epoch'tan itibaren UTC dakika (aşağı yuvarlanır)"""
+    return math.floor(value.timestamp() / 60)
+
+
+def from_utc_minutes(minutes: int, tz=TURKEY_TZ) -> datetime:
+    """UTC dakikayı verilen saat diliminde datetime'a çevir"""
+    return datetime.fromtimestamp(minutes * 60, tz)
+
+
+def _clock_minutes(value: str) -> int:
+    """'HH:MM' -> gece yarısından itibaren dakika"""
+    hour, minute = value.split(':')[:2]
+    return int(hour) * 60 + int(minute)
+
+
+def local_window_minutes(hours: WorkingHours, local_date: date) -> Tuple[int, int]:
+    """Yerel bir gün için çalışma saatleri penceresi (UTC dakika)"""
+    tz = get_timezone(hours.timezone)
+    midnight = datetime(local_date.year, local_date.month, local_date.day)
+    window_start = tz.localize(midnight + timedelta(minutes=_clock_minutes(hours.start)))
+    window_end = tz.localize(midnight + timedelta(minutes=_clock_minutes(hours.end)))
+    return to_utc_minutes(window_start), to_utc_minutes(window_end)
+
+
+def working_windows_minutes(hours: WorkingHours, frame_start: int, frame_end: int) -> List[Tuple[int, int]]:
+    """Katılımcının [frame_start, frame_end) ile kesişen çalışma pencereleri - yerel gün sınırları aşılabilir"""
+    tz = get_timezone(hours.timezone)
+    local_day = from_utc_minutes(frame_start, tz).date()
+    last_day = from_utc_minutes(frame_end, tz).date()
+    windows = []
+    while local_day <= last_day:
+        window_start, window_end = local_window_minutes(hours, local_day)
+        window_start, window_end = max(window_start, frame_start), min(window_end, frame_end)
+        if window_start < window_end:
+            windows.append((window_start, window_end))
+        local_day += timedelta(days=1)
+    return windows
+
+
+def intersect_windows(first: List[Tuple[int, int]], second: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """İki sıralı pencere listesinin kesişimi (iki işaretçi)"""
+    windows = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        window_start = max(first[i][0], second[j][0])
+        window_end = min(first[i][1], second[j][1])
+        if window_start < window_end:
+            windows.append((window_start, window_end))
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return windows
+
+
+def day_windows(day: datetime, organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS,
+                working_hours: Optional[Dict[str, WorkingHours]] = None) -> Tuple[Tuple[int, int], List[Tuple[int, int]]]:
+    """Organizatörün yerel günü için mesai çerçevesi ve katılımcıların çalışma saatleriyle kesişen pencereler"""
+    frame = local_window_minutes(organizer_hours, day.date())
+    windows = [frame]
+    for hours in set((working_hours or {}).values()) - {organizer_hours}:
+        windows = intersect_windows(windows, working_windows_minutes(hours, *frame))
+    return frame, windows
+
+
+def _remote_timezones(working_hours: Optional[Dict[str, WorkingHours]],
+                      organizer_hours: WorkingHours) -> Dict[str, object]:
+    """Organizatörden farklı saat dilimindeki katılımcılar"""
+    return {
+        email: get_timezone(hours.timezone)
+        for email, hours in (working_hours or {}).items() if hours.timezone != organizer_hours.timezone
+    }
+
+
+def _add_participant_local_times(slot: Dict, slot_start: datetime, remote_participants: Dict[str, object]) -> Dict:
+    """Slota uzak katılımcıların yerel başlangıç saatlerini ekle"""
+    if remote_participants:
+        slot['participant_local_times'] = {
+            email: slot_start.astimezone(tz).strftime('%H:%M') for email, tz in remote_participants.items()
+        }
+    return slot
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Aralıkları sıralayıp çakışan veya birbirine değenleri birleştir"""
+    intervals.sort()
+    merged = []
+    for busy_start, busy_end in intervals:
+        if merged and busy_start <= merged[-1][1]:
+            if busy_end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], busy_end)
+        else:
+            merged.append((busy_start, busy_end))
+    return merged
+
+
+def _busy_minutes(calendar_data: Dict) -> List[Tuple[int, int]]:
+    """Tek takvimin meşgul bloklarını UTC dakikaya çevir (başlangıç aşağı, bitiş yukarı)"""
+    intervals = []
+    for busy_period in calendar_data.get('busy', []):
+        busy_start = math.floor(_parse_iso(busy_period['start']).timestamp() / 60)
+        busy_end = math.ceil(_parse_iso(busy_period['end']).timestamp() / 60)
+        if busy_end >= busy_start:
+            intervals.append((busy_start, busy_end))
+    return intervals
+
+
+def merge_busy_minutes(busy_times: Dict) -> List[Tuple[int, int]]:
+    """Tüm katılımcıların meşgul bloklarını UTC dakikaya çevirip birleştir"""
+    intervals = []
+    for calendar_data in busy_times.values():
+        intervals.extend(_busy_minutes(calendar_data))
+    return _merge_intervals(intervals)
+
+
+def is_free_minutes(merged_busy: List[Tuple[int, int]], busy_ends: List[int], start: int, end: int) -> bool:
+    """Birleştirilmiş meşgul listesinde [start, end) ile çakışan blok yok mu"""
+    first = bisect_right(busy_ends, start)
+    return first == len(merged_busy) or merged_busy[first][0] >= end
+
+
+def iter_free_minutes(merged_busy: List[Tuple[int, int]], busy_ends: List[int],
+                      windows: List[Tuple[int, int]], duration_minutes: int, anchor: int,
+                      step_minutes: int = SLOT_STEP_MINUTES):
+    """Pencerelerdeki boşlukları tara, anchor'a hizalı grid üzerindeki uygun başlangıçları üret"""
+    for window_start, window_end in windows:
+        index = bisect_right(busy_ends, window_start)
+        cursor = window_start
+        while cursor < window_end:
+            gap_end = min(merged_busy[index][0], window_end) if index < len(merged_busy) else window_end
+            if gap_end > cursor:
+                slot_start = anchor - ((anchor - cursor) // step_minutes) * step_minutes
+                while slot_start + duration_minutes <= gap_end:
+                    yield slot_start
+                    slot_start += step_minutes
+            if index >= len(merged_busy):
+                break
+            cursor = max(cursor, merged_busy[index][1])
+            index += 1
+
+
+def rasterize_busy(busy_times: Dict, grid_start: int, grid_end: int):
+    """Meşgul blokları [grid_start, grid_end) dakika grid'ine tek satırlık fark dizisiyle rasterize et
+
+    Tüm katılımcıların blokları aynı satıra eklenir; kapsama > 0 katılımcılar üzerinde OR ile aynıdır.
+    Sıfır uzunluklu bloklar ayrı sayılır (sweep'te olduğu gibi içinden geçen slotları engeller).
+    Dönüş: (meşgul dakika prefix toplamı, anlık blok prefix toplamı)
+    """
+    total = max(grid_end - grid_start, 0)
+    intervals = []
+    for calendar_data in busy_times.values():
+        intervals.extend(_busy_minutes(calendar_data))
+    if not intervals:
+        empty = np.zeros(total + 1, dtype=np.int32)
+        return empty, empty
+
+    bounds = np.array(intervals, dtype=np.int64) - grid_start
+    instants = bounds[bounds[:, 0] == bounds[:, 1], 0]
+    instants = instants[(instants >= 0) & (instants < total)]
+    np.clip(bounds, 0, total, out=bounds)
+
+    diff = np.bincount(bounds[:, 0], minlength=total + 1) - np.bincount(bounds[:, 1], minlength=total + 1)
+    busy_mask = np.cumsum(diff[:total]) > 0
+    busy_prefix = np.concatenate(([0], np.cumsum(busy_mask, dtype=np.int32)))
+    instant_prefix = np.concatenate(([0], np.cumsum(np.bincount(instants, minlength=total), dtype=np.int32)))
+    return busy_prefix, instant_prefix
+
+
+def iter_free_minutes_in_mask(busy_prefix, instant_prefix, grid_start: int,
+                              windows: List[Tuple[int, int]], duration_minutes: int, anchor: int,
+                              step_minutes: int = SLOT_STEP_MINUTES):
+    """Rasterize edilmiş maskede kayan pencere ile iter_free_minutes'in ürettiği başlangıçları bul"""
+    for window_start, window_end in windows:
+        first = anchor - ((anchor - window_start) // step_minutes) * step_minutes
+        cells = np.arange(first, window_end - duration_minutes + 1, step_minutes) - grid_start
+        if not len(cells):
+            continue
+        # Pencere içinde meşgul dakika ve slotun içine düşen anlık blok olmamalı
+        free = busy_prefix[cells + duration_minutes] == busy_prefix[cells]
+        if duration_minutes > 1:
+            free &= instant_prefix[cells + duration_minutes] == instant_prefix[cells + 1]
+        for cell in cells[free].tolist():
+            yield grid_start + cell
+
+
+def use_bitmap_engine() -> bool:
+    """Bitmap motoru yalnızca AVAILABILITY_ENGINE=bitmap ile ve NumPy kuruluysa seçilir"""
+    return np is not None and AVAILABILITY_ENGINE == 'bitmap'
+
+
+def score_slot(slot_start: datetime) -> float:
+    """Saat dilimine göre slot skoru"""
+    hour = slot_start.hour
+    if 10 <= hour <= 11:
+        return 0.9
+    elif 14 <= hour <= 16:
+        return 0.8
+    elif 9 <= hour <= 10 or 11 <= hour <= 12:
+        return 0.7
+    return 0.6
+
+
+def _score_earliest(slot_start: datetime) -> float:
+    """Günün erken saatlerini tercih eden skor (00:00 -> 1.0)"""
+    return round(1 - (slot_start.hour * 60 + slot_start.minute) / (24 * 60), 4)
+
+
+def _nearest_policy(target: datetime = None, **_) -> Callable[[datetime], float]:
+    """Hedef zamana yakınlığa göre skor - fark saat cinsinden büyüdükçe azalır"""
+    if target is None:
+        raise ValueError("'nearest' skorlama politikası hedef zaman (target) gerektirir")
+
+    def score(slot_start: datetime) -> float:
+        hours_away = abs((slot_start - target).total_seconds()) / 3600
+        return round(1 / (1 + hours_away), 4)
+    return score
+
+
+ScoringPolicy = Union[str, Callable[[datetime], float]]
+
+def histogram_scorer(weights: List[float], base: Callable[[datetime], float] = score_slot,
+                     blend: float = 0.5) -> Callable[[datetime], float]:
+    """Gün dilimi ağırlıklarını (0-1) temel skorla karıştıran O(1) skor fonksiyonu"""
+    if not weights or not any(weights):
+        return base
+    bucket_minutes = 24 * 60 // len(weights)
+
+    def score(slot_start: datetime) -> float:
+        bucket = (slot_start.hour * 60 + slot_start.minute) // bucket_minutes
+        return round((1 - blend) * base(slot_start) + blend * weights[bucket], 4)
+    return score
+
+
+# Skorlama politikası fabrikaları - isim -> (bağlam ayarları) -> skor fonksiyonu.
+# Fabrikalar tanımadıkları bağlam anahtarlarını (participants, organizer_email...) yok sayar.
+_SCORING_POLICIES: Dict[str, Callable[..., Callable[[datetime], float]]] = {
+    'time_of_day': lambda **_: score_slot,
+    'earliest': lambda **_: _score_earliest,
+    'nearest': _nearest_policy,
+}
+_default_scoring_policy = 'time_of_day'
+
+
+def register_scoring_policy(name: str, factory: Callable[..., Callable[[datetime], float]]):
+    """Yeni skorlama politikası kaydet - factory(**context) skor fonksiyonu döndürmeli"""
+    _SCORING_POLICIES[name] = factory
+
+
+def set_default_scoring_policy(name: str):
+    """'default' politikasının işaret ettiği kayıtlı politikayı değiştir"""
+    if name not in _SCORING_POLICIES:
+        raise ValueError(f"Bilinmeyen skorlama politikası: {name}")
+    global _default_scoring_policy
+    _default_scoring_policy = name
+
+
+def get_scoring_policy(policy: ScoringPolicy = 'default', **options) -> Callable[[datetime], float]:
+    """İsim veya doğrudan fonksiyon olarak verilen politikayı skor fonksiyonuna çevir"""
+    if callable(policy):
+        return policy
+    if policy == 'default':
+        policy = _default_scoring_policy
+    if policy not in _SCORING_POLICIES:
+        raise ValueError(f"Bilinmeyen skorlama politikası: {policy} (mevcut: {', '.join(sorted(_SCORING_POLICIES))})")
+    return _SCORING_POLICIES[policy](**options)
+
+
+def top_k_slot_starts(slot_starts: Iterable[datetime], k: int,
+                      scorer: Callable[[datetime], float]) -> List[Tuple[float, datetime]]:
+    """Adayları tembel skorlayıp sınırlı heap'te en iyi k'yı tut - eşit skorda kronolojik sıra"""
+    return heapq.nlargest(k, ((scorer(slot_start), slot_start) for slot_start in slot_starts),
+                          key=itemgetter(0))
+
+
+def build_slot(slot_start: datetime, slot_date: datetime, duration_minutes: int, score: float) -> Dict:
+    """Tool'un döndürdüğü slot sözlüğünü oluştur"""
+    slot_end = slot_start + timedelta(minutes=duration_minutes)
+    return {
+        'start': slot_start.strftime('%H:%M'),
+        'end': slot_end.strftime('%H:%M'),
+        'date': slot_date.strftime('%Y-%m-%d'),
+        'score': score,
+        'duration': duration_minutes,
+        'start_datetime': slot_start.isoformat(),
+        'end_datetime': slot_end.isoformat()
+    }
+
+
+def calculate_free_slots_by_day(busy_times: Dict, dates: List[datetime], duration_minutes: int,
+                                k: int = MAX_SLOTS, policy: ScoringPolicy = 'default',
+                                working_hours: Optional[Dict[str, WorkingHours]] = None,
+                                organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS) -> Dict[str, List[Dict]]:
+    """Birden çok gün için slotları tek parse/birleştirme (veya tek rasterize) ile hesapla
+
+    Günler organizatörün saat diliminde yorumlanır; working_hours'taki katılımcıların çalışma
+    pencereleri kesiştirilir. Tüm hesaplama tamsayı UTC dakika üzerinde yapılır, datetime'a
+    yalnızca skorlama ve sonuç slotları için dönülür.
+    """
+    scorer = get_scoring_policy(policy)
+    organizer_tz = get_timezone(organizer_hours.timezone)
+    remote_participants = _remote_timezones(working_hours, organizer_hours)
+    frames = [(day, *day_windows(day, organizer_hours, working_hours)) for day in dates]
+
+    slots_by_day = {}
+    if not frames:
+        return slots_by_day
+
+    if use_bitmap_engine():
+        grid_start = min(frame[0] for _, frame, _ in frames)
+        grid_end = max(frame[1] for _, frame, _ in frames)
+        busy_prefix, instant_prefix = rasterize_busy(busy_times, grid_start, grid_end)
+
+        def day_slot_minutes(frame, windows):
+            return iter_free_minutes_in_mask(busy_prefix, instant_prefix, grid_start, windows,
+                                             duration_minutes, anchor=frame[0])
+    else:
+        merged_busy = merge_busy_minutes(busy_times)
+        busy_ends = [busy_end for _, busy_end in merged_busy]
+
+        def day_slot_minutes(frame, windows):
+            return iter_free_minutes(merged_busy, busy_ends, windows, duration_minutes, anchor=frame[0])
+
+    for day, frame, windows in frames:
+        # Sözlükler yalnızca kazanan slotlar için oluşturulur
+        slot_starts = (from_utc_minutes(minutes, organizer_tz) for minutes in day_slot_minutes(frame, windows))
+        winners = top_k_slot_starts(slot_starts, k, scorer)
+        slots_by_day[day.strftime('%Y-%m-%d')] = [
+            _add_participant_local_times(build_slot(slot_start, day, duration_minutes, score),
+                                         slot_start, remote_participants)
+            for score, slot_start in winners
+        ]
+
+    return slots_by_day
+
+
+def is_window_free(merged_busy: List[Tuple[int, int]], window_start: datetime, window_end: datetime) -> bool:
+    """merge_busy_minutes listesinde pencereyle çakışan blok yok mu"""
+    busy_ends = [busy_end for _, busy_end in merged_busy]
+    return is_free_minutes(merged_busy, busy_ends, to_utc_minutes(window_start),
+                           math.ceil(window_end.timestamp() / 60))
+
+
+def nearest_free_slots(busy_times: Dict, requested_start: datetime, duration_minutes: int,
+                       limit: int = 3, working_hours: Optional[Dict[str, WorkingHours]] = None,
+                       organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS) -> List[Dict]:
+    """İstenen başlangıca en yakın boş slotlar (organizatörün aynı günündeki ortak çalışma saatleri içinde)"""
+    organizer_tz = get_timezone(organizer_hours.timezone)
+    local_start = requested_start.astimezone(organizer_tz)
+    frame, windows = day_windows(local_start, organizer_hours, working_hours)
+    merged_busy = merge_busy_minutes(busy_times)
+    busy_ends = [busy_end for _, busy_end in merged_busy]
+
+    requested_minute = to_utc_minutes(requested_start)
+    slot_starts = (
+        from_utc_minutes(minutes, organizer_tz)
+        for minutes in iter_free_minutes(merged_busy, busy_ends, windows, duration_minutes, anchor=frame[0])
+        if minutes != requested_minute
+    )
+    winners = top_k_slot_starts(slot_starts, limit, get_scoring_policy('nearest', target=requested_start))
+    remote_participants = _remote_timezones(working_hours, organizer_hours)
+    return [
+        _add_participant_local_times(build_slot(slot_start, local_start, duration_minutes, score),
+                                     slot_start, remote_participants)
+        for score, slot_start in winners
+    ]
+
+
+def quorum_slots(busy_times: Dict, day: datetime, duration_minutes: int,
+                 required: Iterable[str] = (), weights: Dict[str, float] = None,
+                 k: int = MAX_SLOTS, policy: ScoringPolicy = 'default',
+                 step_minutes: int = SLOT_STEP_MINUTES, working_hours: Optional[Dict[str, WorkingHours]] = None,
+                 organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS) -> List[Dict]:
+    """Herkesin boş olduğu slot yoksa: zorunlu katılımcıların boş olduğu, ağırlıklı katılımı en yüksek k slot
+
+    Adaylar organizatörün mesai çerçevesindeki grid noktalarıdır; bir katılımcı çalışma saatleri
+    dışında kalan adaylarda eksik sayılır. Aday başlangıçlar üzerinde fark dizisi ile tek geçişte
+    her slot için meşgul ağırlığı bulunur; eksik katılımcı listesi yalnızca kazanan slotlar için hesaplanır.
+    """
+    scorer = get_scoring_policy(policy)
+    organizer_tz = get_timezone(organizer_hours.timezone)
+    frame_start, frame_end = local_window_minutes(organizer_hours, day.date())
+    candidate_count = (frame_end - duration_minutes - frame_start) // step_minutes + 1
+    if candidate_count <= 0:
+        return []
+
+    required = set(required)
+    weights = weights or {}
+    working_hours = working_hours or {}
+    total_weight = sum(weights.get(attendee, 1.0) for attendee in busy_times)
+    busy_weight_diff = [0.0] * (candidate_count + 1)
+    required_busy_diff = [0] * (candidate_count + 1)
+    attendee_busy = {}
+
+    for attendee, calendar_data in busy_times.items():
+        intervals = _busy_minutes(calendar_data)
+        hours = working_hours.get(attendee)
+        if hours is not None and hours != organizer_hours:
+            # Çalışma saatleri dışı meşgul sayılır
+            off_hours = []
+            cursor = frame_start
+            for window_start, window_end in working_windows_minutes(hours, frame_start, frame_end):
+                off_hours.append((cursor, window_start))
+                cursor = window_end
+            off_hours.append((cursor, frame_end))
+            intervals.extend(interval for interval in off_hours if interval[1] > interval[0])
+        # Sıfır uzunluklu bloklar korunur - sweep'te olduğu gibi içinden geçen slotları engeller
+        merged_busy = _merge_intervals(intervals)
+        attendee_busy[attendee] = (merged_busy, [busy_end for _, busy_end in merged_busy])
+        weight = weights.get(attendee, 1.0)
+        covered = 0
+        for busy_start, busy_end in merged_busy:
+            # [s, s+d) penceresi [busy_start, busy_end) ile çakışır <=> busy_start - d < s < busy_end;
+            # ardışık blokların aday aralıkları kesişebilir, kişi aynı adayda iki kez sayılmaz
+            first = max(covered, (busy_start - duration_minutes - frame_start) // step_minutes + 1)
+            last = min(candidate_count, -((frame_start - busy_end) // step_minutes))
+            if first >= last:
+                continue
+            covered = last
+            busy_weight_diff[first] += weight
+            busy_weight_diff[last] -= weight
+            if attendee in required:
+                required_busy_diff[first] += 1
+                required_busy_diff[last] -= 1
+
+    def candidates():
+        busy_weight, required_busy = 0.0, 0
+        for index in range(candidate_count):
+            busy_weight += busy_weight_diff[index]
+            required_busy += required_busy_diff[index]
+            if required_busy == 0:
+                slot_minute = frame_start + index * step_minutes
+                slot_start = from_utc_minutes(slot_minute, organizer_tz)
+                yield (round(total_weight - busy_weight, 6), scorer(slot_start)), slot_minute, slot_start
+
+    winners = heapq.nlargest(k, candidates(), key=itemgetter(0))
+    remote_participants = _remote_timezones(working_hours, organizer_hours)
+
+    slots = []
+    for (attendance, score), slot_minute, slot_start in winners:
+        missing = [
+            attendee for attendee, (merged_busy, busy_ends) in attendee_busy.items()
+            if not is_free_minutes(merged_busy, busy_ends, slot_minute, slot_minute + duration_minutes)
+        ]
+        slot = build_slot(slot_start, day, duration_minutes, score)
+        slot.update({
+            'attendance': attendance,
+            'attendance_ratio': round(attendance / total_weight, 4) if total_weight else 1.0,
+            'available_attendees': [attendee for attendee in busy_times if attendee not in missing],
+            'missing_attendees': missing
+        })
+        slots.append(_add_participant_local_times(slot, slot_start, remote_participants))
+    return slots
+
+
+def normalize_rrule(recurrence: str) -> str:
+    """'FREQ=WEEKLY;COUNT=4' veya 'RRULE:FREQ=...' -> Google Calendar'ın beklediği 'RRULE:...' biçimi"""
+    rule = recurrence.strip()
+    if not rule.upper().startswith('RRULE:'):
+        rule = f'RRULE:{rule}'
+    return rule
+
+
+_UTC_UNTIL = re.compile(r'UNTIL=(\d{8}T\d{6})Z', re.IGNORECASE)
+_RRULE_END = re.compile(r'(?:^|[:;])(?:COUNT|UNTIL)=', re.IGNORECASE)
+
+
+def is_finite_rrule(recurrence: str) -> bool:
+    """RRULE'un COUNT veya UNTIL ile bir sonu var mı"""
+    return bool(_RRULE_END.search(normalize_rrule(recurrence)))
+
+
+def _localize_until(rule: str, tz) -> str:
+    """UTC UNTIL (Google'ın zamanlı event'ler için istediği biçim) -> naive dtstart ile uyumlu yerel saat"""
+    def convert(match):
+        until = pytz.utc.localize(datetime.strptime(match.group(1), '%Y%m%dT%H%M%S'))
+        return f"UNTIL={until.astimezone(tz).strftime('%Y%m%dT%H%M%S')}"
+    return _UTC_UNTIL.sub(convert, rule)
+
+
+def expand_recurrence(recurrence: str, first_date: datetime,
+                      max_occurrences: int = MAX_RECURRENCE_OCCURRENCES, tz=None) -> List[datetime]:
+    """RRULE'u ilk tarihten başlayarak gün listesine aç (sonsuz kurallar max_occurrences ile kesilir)
+
+    Günler tz (verilmezse first_date'in dilimi, o da yoksa İstanbul) takvimindedir; UTC UNTIL bu dilime çevrilir.
+    """
+    tz = tz or first_date.tzinfo or TURKEY_TZ
+    first_date = first_date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    try:
+        rule_text = _localize_until(normalize_rrule(recurrence)[len('RRULE:'):], tz)
+        rule = rrulestr(rule_text, dtstart=first_date)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Geçersiz tekrar kuralı (RRULE): {recurrence}") from e
+    return list(islice(rule, max_occurrences))
+
+
+def recurring_free_slots(busy_times: Dict, occurrence_dates: List[datetime], duration_minutes: int,
+                         k: int = MAX_SLOTS, policy: ScoringPolicy = 'default',
+                         working_hours: Optional[Dict[str, WorkingHours]] = None,
+                         organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS) -> List[Dict]:
+    """Serinin tüm tekrarlarında boş olan günün saatlerini bul - tek birleştirme, gün başına bisect"""
+    if not occurrence_dates:
+        return []
+    scorer = get_scoring_policy(policy)
+    organizer_tz = get_timezone(organizer_hours.timezone)
+    merged_busy = merge_busy_minutes(busy_times)
+    busy_ends = [busy_end for _, busy_end in merged_busy]
+
+    # Her tekrar için organizatörün mesai başlangıcına göre dakika ofsetleri (yaz saati geçişlerinde
+    # aynı yerel saat), kümeler kesiştirilir
+    common_offsets = None
+    first_frame = None
+    for day in occurrence_dates:
+        frame, windows = day_windows(day, organizer_hours, working_hours)
+        first_frame = first_frame or frame
+        offsets = {
+            minutes - frame[0]
+            for minutes in iter_free_minutes(merged_busy, busy_ends, windows, duration_minutes, anchor=frame[0])
+        }
+        common_offsets = offsets if common_offsets is None else common_offsets & offsets
+        if not common_offsets:
+            return []
+
+    first_day = occurrence_dates[0]
+    winners = top_k_slot_starts(
+        (from_utc_minutes(first_frame[0] + offset, organizer_tz) for offset in sorted(common_offsets)), k, scorer
+    )
+    remote_participants = _remote_timezones(working_hours, organizer_hours)
+    slots = []
+    for score, slot_start in winners:
+        slot = build_slot(slot_start, first_day, duration_minutes, score)
+        slot['occurrences'] = len(occurrence_dates)
+        slot['occurrence_dates'] = [day.strftime('%Y-%m-%d') for day in occurrence_dates]
+        slots.append(_add_participant_local_times(slot, slot_start, remote_participants))
+    return slots
+
+
+def calculate_free_slots(busy_times: Dict, start_date: datetime, duration_minutes: int,
+                         k: int = MAX_SLOTS, policy: ScoringPolicy = 'default',
+                         working_hours: Optional[Dict[str, WorkingHours]] = None,
+                         organizer_hours: WorkingHours = DEFAULT_WORKING_HOURS) -> List[Dict]:
+    """Müsait zaman dilimlerini hesapla - interval-sweep (AVAILABILITY_ENGINE=bitmap ile NumPy bitmap)"""
+    slots_by_day = calculate_free_slots_by_day(busy_times, [start_date], duration_minutes, k, policy,
+                                               working_hours, organizer_hours)
+    return slots_by_day[start_date.strftime('%Y-%m-%d')]
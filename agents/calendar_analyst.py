@@ -5,9 +5,14 @@ Google ADK Calendar Analyst Agent - OAuth 2.0 Version
 
 import os
 import json
-import pickle
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -15,6 +20,21 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.adk.agents import Agent
 
+from .availability import (
+    DEFAULT_WORKING_HOURS, MAX_RECURRENCE_OCCURRENCES, MAX_SLOTS, calculate_free_slots,
+    calculate_free_slots_by_day, expand_recurrence, get_scoring_policy, get_timezone, get_working_hours,
+    is_finite_rrule, normalize_rrule, quorum_slots, recurring_free_slots
+)
+from .calendar_backend import CalendarBackend
+from .calendar_sync import CalendarSyncIndex
+from .rate_limit import CalendarRateLimiter, is_rate_limit_error
+from .token_store import TokenRefresher, is_expiring, load_token, save_token_atomic, token_file_lock
+
+# Alternatif gün arama ufku (gün)
+DEFAULT_SEARCH_DAYS = 7
+MAX_SEARCH_DAYS = 14
+MAX_ALTERNATIVE_DATES = 3
+
 class OAuth2CalendarService:
     """Google Calendar API Service with OAuth 2.0"""
     
@@ -23,27 +43,36 @@ class OAuth2CalendarService:
         'https://www.googleapis.com/auth/calendar.events'
     ]
     
-    def __init__(self):
-        self.credentials_file = "oauth_credentials.json"  # İndirdiğiniz dosya
-        self.token_file = "token.pickle"
+    def __init__(self, token_file: str = "token.pickle", credentials_file: str = "oauth_credentials.json",
+                 allow_browser_flow: bool = True):
+        self.credentials_file = credentials_file  # İndirdiğiniz dosya
+        self.token_file = token_file
+        self.allow_browser_flow = allow_browser_flow
         self.service = None
+        self.credentials = None
         self.user_email = None
+        self._thread_local = threading.local()
         self._authenticate()
     
     def _authenticate(self):
         """OAuth 2.0 Authentication"""
-        creds = None
-        
         # Daha önce kaydedilmiş token var mı?
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+        creds = load_token(self.token_file)
         
         # Token yoksa veya geçersizse yeniden auth yap
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
-                print("🔄 Token yenileniyor...")
-                creds.refresh(Request())
+                with token_file_lock(self.token_file):
+                    # Başka bir worker bu arada yenilemiş olabilir
+                    disk_creds = load_token(self.token_file)
+                    if disk_creds is not None and disk_creds.valid:
+                        creds = disk_creds
+                    else:
+                        print("🔄 Token yenileniyor...")
+                        creds.refresh(Request())
+                        save_token_atomic(self.token_file, creds)
+            elif not self.allow_browser_flow:
+                raise RuntimeError(f"{self.token_file} için geçerli token yok - browser akışı kapalı")
             else:
                 print("🔐 OAuth 2.0 Authentication başlatılıyor...")
                 print("📱 Browser açılacak, Google hesabınızla giriş yapın...")
@@ -51,16 +80,23 @@ class OAuth2CalendarService:
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.credentials_file, self.SCOPES)
                 creds = flow.run_local_server(port=8081)  # ADK'dan farklı port
-            
-            # Token'ı kaydet
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+                
+                # Token'ı kaydet
+                with token_file_lock(self.token_file):
+                    save_token_atomic(self.token_file, creds)
+        
+        self.credentials = creds
         
         try:
-            self.service = build('calendar', 'v3', credentials=creds)
+            # static_discovery: paketle gelen discovery dokümanı, ağ isteği yok
+            self.service = build('calendar', 'v3', credentials=creds, static_discovery=True)
+            self._thread_local.service = self.service
             
-            # Kullanıcı email'ini al
-            profile = self.service.calendarList().get(calendarId='primary').execute()
+            # Kullanıcı email'ini al - email henüz bilinmediği için hız sınırı anahtarı token dosyası
+            service = self.service
+            profile = calendar_rate_limiter.call(
+                self.token_file, lambda: service.calendarList().get(calendarId='primary').execute()
+            )
             self.user_email = profile.get('id', 'unknown@gmail.com')
             
             print(f"✅ OAuth 2.0 başarılı: {self.user_email}")
@@ -68,14 +104,594 @@ class OAuth2CalendarService:
         except Exception as e:
             print(f"❌ OAuth 2.0 hatası: {e}")
             self.service = None
+    
+    def thread_service(self):
+        """Thread'e özel Calendar service - httplib2 thread-safe değil"""
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            service = build('calendar', 'v3', credentials=self.credentials, static_discovery=True)
+            self._thread_local.service = service
+        return service
+    
+    def refresh_if_expiring(self, margin_seconds: float = 300) -> bool:
+        """Token margin_seconds içinde dolacaksa şimdi yenile ve atomik olarak kaydet"""
+        creds = self.credentials
+        if not creds or not creds.refresh_token or not is_expiring(creds, margin_seconds):
+            return False
+        
+        with token_file_lock(self.token_file):
+            # Aynı token dosyasını paylaşan başka bir worker yenilediyse onu kullan
+            disk_creds = load_token(self.token_file)
+            if disk_creds is not None and not is_expiring(disk_creds, margin_seconds):
+                creds.token = disk_creds.token
+                creds.expiry = disk_creds.expiry
+                return False
+            
+            print(f"🔄 Token süresi dolmadan yenileniyor: {self.user_email or self.token_file}")
+            creds.refresh(Request())
+            save_token_atomic(self.token_file, creds)
+        return True
+    
+    def close(self):
+        """HTTP bağlantılarını kapat"""
+        if self.service is not None:
+            try:
+                self.service.close()
+            except Exception:
+                pass
+
+
+class CalendarServicePool:
+    """Organizatör email'ine göre OAuth Calendar servis havuzu - sınırlı boyut, LRU eviction"""
+    
+    def __init__(self, token_dir: str = "tokens", max_size: int = 32, refresh_margin_seconds: float = 300):
+        self.token_dir = token_dir
+        self.max_size = max_size
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._services: "OrderedDict[str, OAuth2CalendarService]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def token_file_for(self, organizer_email: str) -> str:
+        """Organizatöre ait token dosyası (tokens/<email>.pickle)"""
+        safe_name = ''.join(c if c.isalnum() or c in '@._-' else '_' for c in organizer_email.lower())
+        return os.path.join(self.token_dir, f"{safe_name}.pickle")
+    
+    def has_token(self, organizer_email: str) -> bool:
+        return os.path.exists(self.token_file_for(organizer_email))
+    
+    def get(self, organizer_email: str) -> Optional[OAuth2CalendarService]:
+        """Organizatörün servisini getir; yoksa token dosyasından oluştur, gerekirse token'ı yenile"""
+        key = organizer_email.lower()
+        with self._lock:
+            oauth_service = self._services.get(key)
+            if oauth_service is not None:
+                self._services.move_to_end(key)
+        
+        if oauth_service is None:
+            if not self.has_token(organizer_email):
+                return None
+            try:
+                oauth_service = OAuth2CalendarService(
+                    token_file=self.token_file_for(organizer_email),
+                    allow_browser_flow=False
+                )
+            except Exception as e:
+                print(f"❌ {organizer_email}: OAuth servis oluşturma hatası - {e}")
+                return None
+            if not oauth_service.service:
+                return None
+            
+            with self._lock:
+                # Paralel oluşturmada ilk ekleneni koru
+                existing = self._services.get(key)
+                if existing is not None:
+                    oauth_service.close()
+                    oauth_service = existing
+                else:
+                    self._services[key] = oauth_service
+                    token_refresher.start()
+                self._services.move_to_end(key)
+                evicted = []
+                while len(self._services) > self.max_size:
+                    evicted.append(self._services.popitem(last=False)[1])
+            for evicted_service in evicted:
+                evicted_service.close()
+        
+        try:
+            oauth_service.refresh_if_expiring(self.refresh_margin_seconds)
+        except Exception as e:
+            print(f"⚠️ {organizer_email}: proaktif token yenileme hatası - {e}")
+        return oauth_service
+    
+    def evict(self, organizer_email: str):
+        """Organizatörün servisini havuzdan çıkar"""
+        with self._lock:
+            oauth_service = self._services.pop(organizer_email.lower(), None)
+        if oauth_service is not None:
+            oauth_service.close()
+    
+    def services(self) -> List[OAuth2CalendarService]:
+        """Havuzdaki servislerin anlık listesi"""
+        with self._lock:
+            return list(self._services.values())
+
+
+# Organizatör başına servis havuzu
+service_pool = CalendarServicePool(
+    token_dir=os.getenv('CALENDAR_TOKEN_DIR', 'tokens'),
+    max_size=int(os.getenv('CALENDAR_SERVICE_POOL_SIZE', '32'))
+)
+
+# Global service instance - import sırasında değil, ilk tool kullanımında oluşturulur
+_oauth_service: Optional[OAuth2CalendarService] = None
+_oauth_service_lock = threading.Lock()
+
+# Global servis + havuzdaki tüm token'ları süresi dolmadan yenileyen arka plan thread'i
+token_refresher = TokenRefresher(
+    lambda: ([_oauth_service] if _oauth_service else []) + service_pool.services(),
+    margin_seconds=float(os.getenv('TOKEN_REFRESH_MARGIN', '600')),
+    interval_seconds=float(os.getenv('TOKEN_REFRESH_INTERVAL', '60'))
+)
+
+
+def get_oauth_service() -> Optional[OAuth2CalendarService]:
+    """Global OAuth servisini ilk kullanımda thread-safe şekilde oluştur"""
+    global _oauth_service
+    if _oauth_service is None:
+        with _oauth_service_lock:
+            if _oauth_service is None:
+                try:
+                    _oauth_service = OAuth2CalendarService()
+                except Exception as e:
+                    # Bir sonraki tool çağrısında tekrar denenir
+                    print(f"❌ OAuth 2.0 başlatma hatası: {e}")
+                    return None
+                token_refresher.start()
+    return _oauth_service
+
+
+def get_organizer_oauth_service(organizer_email: Optional[str] = None) -> Optional[OAuth2CalendarService]:
+    """Organizatörün kendi token'ı varsa havuzdaki servisi, yoksa global servisi döndür"""
+    if organizer_email:
+        oauth_service = service_pool.get(organizer_email)
+        if oauth_service is not None:
+            return oauth_service
+    return get_oauth_service()
+
+
+def __getattr__(name):
+    """Geriye dönük uyumluluk: 'from .calendar_analyst import oauth_service' lazy çalışır"""
+    if name == 'oauth_service':
+        return get_oauth_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class FreeBusyCache:
+    """FreeBusy sonuçları için TTL + LRU önbellek - (organizatör, takvim id, zaman penceresi) anahtarlı
+
+    Bir takvimin görünürlüğü sorgulayan organizatörün yetkisine bağlı olduğundan kayıtlar
+    organizatörler arasında paylaşılmaz (coalescer ile aynı kapsam).
+    """
+
+    def __init__(self, ttl_seconds: float = 120, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Optional[str], str, datetime, datetime], Tuple[float, Dict]]" = OrderedDict()
+        self._windows: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def get(self, calendar_id: str, time_min: datetime, time_max: datetime,
+            scope: Optional[str] = None) -> Optional[Dict]:
+        """Pencereyi kapsayan taze bir kayıt varsa ilgili dilimi döndür"""
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self._windows.get(calendar_id, ())):
+                cached_scope, _, cached_min, cached_max = key
+                if cached_scope != scope:
+                    continue
+                expires_at, calendar_data = self._entries[key]
+                if expires_at <= now:
+                    self._remove(key)
+                    continue
+                if cached_min <= time_min and time_max <= cached_max:
+                    self._entries.move_to_end(key)
+                    if (cached_min, cached_max) == (time_min, time_max):
+                        return calendar_data
+                    return _slice_calendar_data(calendar_data, time_min, time_max)
+        return None
+
+    def put(self, calendar_id: str, time_min: datetime, time_max: datetime, calendar_data: Dict,
+            scope: Optional[str] = None):
+        """Takvim sonucunu önbelleğe ekle, gerekirse en eski kaydı çıkar"""
+        key = (scope, calendar_id, time_min, time_max)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, calendar_data)
+            self._entries.move_to_end(key)
+            self._windows.setdefault(calendar_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, calendar_ids: List[str]):
+        """Verilen takvimlerin tüm organizatörlerdeki pencerelerini önbellekten sil"""
+        with self._lock:
+            for calendar_id in calendar_ids:
+                for key in list(self._windows.get(calendar_id, ())):
+                    self._remove(key)
+
+    def clear(self):
+        """Önbelleği tamamen temizle"""
+        with self._lock:
+            self._entries.clear()
+            self._windows.clear()
+
+    def _remove(self, key: Tuple[Optional[str], str, datetime, datetime]):
+        self._entries.pop(key, None)
+        windows = self._windows.get(key[1])
+        if windows is not None:
+            windows.discard(key)
+            if not windows:
+                del self._windows[key[1]]
+
+
+def _slice_calendar_data(calendar_data: Dict, time_min: datetime, time_max: datetime) -> Dict:
+    """Geniş pencereden gelen meşgul blokları alt pencereye kırp"""
+    busy = []
+    for busy_period in calendar_data.get('busy', []):
+        busy_start = datetime.fromisoformat(busy_period['start'].replace('Z', '+00:00'))
+        busy_end = datetime.fromisoformat(busy_period['end'].replace('Z', '+00:00'))
+        if busy_end <= time_min or busy_start >= time_max:
+            continue
+        busy.append({
+            'start': busy_period['start'] if busy_start >= time_min else time_min.isoformat(),
+            'end': busy_period['end'] if busy_end <= time_max else time_max.isoformat()
+        })
+    return {'busy': busy}
+
+
+# Global FreeBusy önbelleği
+freebusy_cache = FreeBusyCache(
+    ttl_seconds=float(os.getenv('FREEBUSY_CACHE_TTL', '120')),
+    max_entries=int(os.getenv('FREEBUSY_CACHE_SIZE', '1024'))
+)
+
+
+class FreeBusyCoalescer:
+    """Eş zamanlı FreeBusy isteklerini birleştirir - aynı takvim/pencere için tek uçuşta istek"""
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[Optional[str], str], List[Tuple[datetime, datetime, Future]]] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, scope: Optional[str], calendar_ids: List[str], time_min: datetime,
+              time_max: datetime) -> Tuple[Dict[str, Tuple[datetime, datetime, Future]], Dict[str, Future]]:
+        """Pencereyi kapsayan uçuştaki istekleri bul, kalan takvimleri bu çağrıya ata"""
+        waiting, owned = {}, {}
+        with self._lock:
+            for calendar_id in calendar_ids:
+                key = (scope, calendar_id)
+                for flight_min, flight_max, future in self._inflight.get(key, ()):
+                    if flight_min <= time_min and time_max <= flight_max:
+                        waiting[calendar_id] = (flight_min, flight_max, future)
+                        break
+                else:
+                    future = Future()
+                    self._inflight.setdefault(key, []).append((time_min, time_max, future))
+                    owned[calendar_id] = future
+        return waiting, owned
+
+    def resolve(self, scope: Optional[str], owned: Dict[str, Future], fetched: Optional[Dict] = None,
+                error: Optional[BaseException] = None):
+        """Bu çağrının sahip olduğu istekleri tamamla ve bekleyenleri uyandır"""
+        with self._lock:
+            for calendar_id, future in owned.items():
+                key = (scope, calendar_id)
+                flights = [flight for flight in self._inflight.get(key, ()) if flight[2] is not future]
+                if flights:
+                    self._inflight[key] = flights
+                else:
+                    self._inflight.pop(key, None)
+
+        for calendar_id, future in owned.items():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((fetched or {}).get(calendar_id))
+
+
+# Global istek birleştirici
+freebusy_coalescer = FreeBusyCoalescer()
+
+
+# FreeBusy sorgu başına takvim limiti ve paralel sorgu thread sayısı
+FREEBUSY_MAX_ITEMS = 50
+FREEBUSY_MAX_WORKERS = int(os.getenv('FREEBUSY_MAX_WORKERS', '8'))
+
+# Google batch endpoint'i istek başına en fazla 50 alt istek kabul eder
+CALENDAR_BATCH_LIMIT = 50
+
+# Tüm Calendar API çağrıları için paylaşılan hız sınırlayıcı (proje + kullanıcı başına)
+calendar_rate_limiter = CalendarRateLimiter(
+    project_qps=float(os.getenv('CALENDAR_PROJECT_QPS', '20')),
+    project_burst=float(os.getenv('CALENDAR_PROJECT_BURST', '40')),
+    user_qps=float(os.getenv('CALENDAR_USER_QPS', '5')),
+    user_burst=float(os.getenv('CALENDAR_USER_BURST', '10')),
+    max_retries=int(os.getenv('CALENDAR_MAX_RETRIES', '5'))
+)
+
+_freebusy_executor = None
+_freebusy_executor_lock = threading.Lock()
+
+
+def _get_freebusy_executor() -> ThreadPoolExecutor:
+    """Paylaşılan, sınırlı FreeBusy thread havuzu (thread'ler service objelerini korur)"""
+    global _freebusy_executor
+    with _freebusy_executor_lock:
+        if _freebusy_executor is None:
+            _freebusy_executor = ThreadPoolExecutor(
+                max_workers=FREEBUSY_MAX_WORKERS, thread_name_prefix='freebusy'
+            )
+        return _freebusy_executor
+
+
+class GoogleCalendarBackend:
+    """Google Calendar API backend'i - OAuth2CalendarService üzerinden"""
+    
+    def __init__(self, oauth_service_provider=None):
+        # Varsayılan: global, lazy oluşturulan OAuth servisi
+        self._oauth_service_provider = oauth_service_provider or get_oauth_service
+    
+    @property
+    def oauth_service(self) -> Optional[OAuth2CalendarService]:
+        return self._oauth_service_provider()
+    
+    def is_available(self) -> bool:
+        oauth_service = self.oauth_service
+        return bool(oauth_service and oauth_service.service)
+    
+    def get_user_email(self) -> Optional[str]:
+        oauth_service = self.oauth_service
+        return oauth_service.user_email if oauth_service else None
+    
+    def _rate_limit_key(self) -> Optional[str]:
+        """Kullanıcı başına hız sınırı anahtarı"""
+        oauth_service = self.oauth_service
+        return oauth_service.user_email or oauth_service.token_file if oauth_service else None
+    
+    def _execute_freebusy_chunk(self, freebusy_query: Dict) -> Dict:
+        """Tek bir FreeBusy parçasını çalıştır ve 'calendars' haritasını döndür"""
+        service = self.oauth_service.thread_service()
+        response = calendar_rate_limiter.call(
+            self._rate_limit_key(),
+            lambda: service.freebusy().query(body=freebusy_query).execute()
+        )
+        return response.get('calendars', {})
+    
+    def query_freebusy(self, calendar_ids: List[str], time_min: datetime, time_max: datetime,
+                       time_zone: str = 'Europe/Istanbul') -> Dict[str, Dict]:
+        """Katılımcıları parçalara bölüp FreeBusy sorgularını paralel çalıştır ve birleştir"""
+        chunks = [
+            calendar_ids[i:i + FREEBUSY_MAX_ITEMS]
+            for i in range(0, len(calendar_ids), FREEBUSY_MAX_ITEMS)
+        ]
+        queries = [
+            {
+                'timeMin': time_min.isoformat(),
+                'timeMax': time_max.isoformat(),
+                'timeZone': time_zone,
+                'items': [{'id': calendar_id} for calendar_id in chunk]
+            }
+            for chunk in chunks
+        ]
+        
+        if len(queries) == 1:
+            return self._execute_freebusy_chunk(queries[0])
+        
+        print(f"⚡ FreeBusy {len(queries)} parçada paralel sorgulanıyor...")
+        executor = _get_freebusy_executor()
+        futures = [executor.submit(self._execute_freebusy_chunk, query) for query in queries]
+        
+        calendars = {}
+        for future in futures:
+            calendars.update(future.result())
+        return calendars
+    
+    def insert_event(self, event: Dict) -> Dict:
+        service = self.oauth_service.thread_service()
+        return calendar_rate_limiter.call(
+            self._rate_limit_key(),
+            lambda: service.events().insert(calendarId='primary', body=event, sendUpdates='all').execute()
+        )
+    
+    def insert_events(self, events: List[Dict]) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """Batch HTTP ile toplu insert - limit aşılırsa otomatik olarak bölünür"""
+        service = self.oauth_service.thread_service()
+        results: List[Optional[Tuple[Optional[Dict], Optional[Exception]]]] = [None] * len(events)
+        
+        def make_callback(index: int):
+            def callback(request_id, response, exception):
+                results[index] = (response, exception)
+            return callback
+        
+        user = self._rate_limit_key()
+        pending = list(range(len(events)))
+        attempt = 0
+        while pending:
+            for chunk_start in range(0, len(pending), CALENDAR_BATCH_LIMIT):
+                chunk = pending[chunk_start:chunk_start + CALENDAR_BATCH_LIMIT]
+                batch = service.new_batch_http_request()
+                for index in chunk:
+                    results[index] = None
+                    batch.add(
+                        service.events().insert(calendarId='primary', body=events[index], sendUpdates='all'),
+                        callback=make_callback(index)
+                    )
+                
+                # Batch içindeki her alt istek kotadan ayrı düşer
+                calendar_rate_limiter.acquire(user, cost=len(chunk))
+                print(f"📅 OAuth 2.0 batch: {len(chunk)} Calendar event tek istekte oluşturuluyor...")
+                try:
+                    batch.execute()
+                except Exception as e:
+                    for index in chunk:
+                        if results[index] is None:
+                            results[index] = (None, e)
+            
+            # Kota hatası alan alt istekler geri çekilme sonrası yeniden denenir
+            pending = [index for index in pending if results[index] and results[index][1] is not None
+                       and is_rate_limit_error(results[index][1])]
+            if not pending:
+                calendar_rate_limiter.on_success(user)
+                break
+            delay = calendar_rate_limiter.on_rate_limited(user, attempt)
+            if delay is None:
+                break
+            print(f"⏳ Calendar API kota sınırı - {len(pending)} event {delay:.2f}s sonra yeniden denenecek")
+            time.sleep(delay)
+            attempt += 1
+        
+        return results
+    
+    def list_events(self, calendar_id: str, sync_token: Optional[str] = None,
+                    page_token: Optional[str] = None) -> Dict:
+        """events.list - sync token ile artımlı, yoksa tam senkronizasyon sayfası"""
+        params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': 2500}
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            params['showDeleted'] = True
+        if page_token:
+            params['pageToken'] = page_token
+        service = self.oauth_service.thread_service()
+        return calendar_rate_limiter.call(self._rate_limit_key(), lambda: service.events().list(**params).execute())
+
+
+# Aktif takvim backend'i - varsayılan Google, testler/benchmark için değiştirilebilir
+_calendar_backend: CalendarBackend = GoogleCalendarBackend()
+
+
+def get_calendar_backend(organizer_email: Optional[str] = None) -> CalendarBackend:
+    """Tool fonksiyonlarının kullandığı aktif takvim backend'i - Google için organizatöre özel"""
+    if organizer_email and isinstance(_calendar_backend, GoogleCalendarBackend) \
+            and service_pool.has_token(organizer_email):
+        return GoogleCalendarBackend(lambda: get_organizer_oauth_service(organizer_email))
+    return _calendar_backend
+
+
+def set_calendar_backend(backend: CalendarBackend):
+    """Takvim backend'ini değiştir (ör. InMemoryCalendarBackend) ve önbelleği temizle"""
+    global _calendar_backend
+    _calendar_backend = backend
+    freebusy_cache.clear()
+
+
+# Opsiyonel yerel meşgul zaman indeksi - kurum içi takvimler için
+calendar_sync_index: Optional[CalendarSyncIndex] = None
+
+
+def enable_calendar_sync(calendar_ids: List[str], max_staleness_seconds: float = 300,
+                         refresh_interval_seconds: float = 60, start: bool = True) -> CalendarSyncIndex:
+    """Verilen takvimler için sync token tabanlı yerel indeksi etkinleştir"""
+    global calendar_sync_index
+    disable_calendar_sync()
+    calendar_sync_index = CalendarSyncIndex(
+        get_calendar_backend, calendar_ids,
+        max_staleness_seconds=max_staleness_seconds,
+        refresh_interval_seconds=refresh_interval_seconds
+    )
+    if start:
+        calendar_sync_index.start()
+    print(f"🔄 Takvim senkronizasyonu etkin: {len(calendar_ids)} takvim")
+    return calendar_sync_index
+
+
+def disable_calendar_sync():
+    """Yerel indeksi kapat - tüm sorgular FreeBusy'ye döner"""
+    global calendar_sync_index
+    if calendar_sync_index is not None:
+        calendar_sync_index.stop()
+        calendar_sync_index = None
+
+
+def _invalidate_busy_data(calendar_ids: List[str]):
+    """Yeni event sonrası önbelleği ve yerel indeksi ilgili takvimler için geçersiz kıl"""
+    freebusy_cache.invalidate(calendar_ids)
+    sync_index = calendar_sync_index
+    if sync_index is not None:
+        sync_index.invalidate(calendar_ids)
+
+
+def query_freebusy(calendar_ids: List[str], time_min: datetime, time_max: datetime,
+                   time_zone: str = 'Europe/Istanbul', organizer_email: Optional[str] = None) -> Dict[str, Dict]:
+    """FreeBusy sorgusu - önbellekte olmayan takvimler parçalı ve paralel sorgulanır,
+    eş zamanlı aynı sorgular tek istekte birleştirilir"""
+    # Önbellek/birleştirme kapsamı: sorguyu gerçekten çalıştıran hesap
+    backend = get_calendar_backend(organizer_email)
+    scope = backend.get_user_email()
+    calendars = {}
+    missing = []
+    sync_index = calendar_sync_index
+    for calendar_id in calendar_ids:
+        # Taze yerel indeks varsa API'ye hiç gitme
+        if sync_index is not None and sync_index.is_fresh(calendar_id):
+            calendars[calendar_id] = sync_index.freebusy(calendar_id, time_min, time_max)
+            continue
+        
+        cached = freebusy_cache.get(calendar_id, time_min, time_max, scope=scope)
+        if cached is not None:
+            calendars[calendar_id] = cached
+        else:
+            missing.append(calendar_id)
+
+    if missing:
+        # Aynı takvim/pencere için uçuşta bir istek varsa ona bağlan, yoksa isteği bu çağrı yapar
+        waiting, owned = freebusy_coalescer.claim(scope, missing, time_min, time_max)
+
+        if owned:
+            try:
+                fetched = backend.query_freebusy(
+                    list(owned), time_min, time_max, time_zone
+                )
+            except BaseException as e:
+                freebusy_coalescer.resolve(scope, owned, error=e)
+                raise
+
+            for calendar_id, calendar_data in fetched.items():
+                calendars[calendar_id] = calendar_data
+                # Hatalı (erişilemeyen) takvimler önbelleğe alınmaz
+                if 'busy' in calendar_data and 'errors' not in calendar_data:
+                    freebusy_cache.put(calendar_id, time_min, time_max, calendar_data, scope=scope)
+            freebusy_coalescer.resolve(scope, owned, fetched=fetched)
 
-# Global service instance
-oauth_service = OAuth2CalendarService()
+        if waiting:
+            print(f"🔗 FreeBusy: {len(waiting)} takvim eş zamanlı bir sorguya bağlandı")
+        for calendar_id, (flight_min, flight_max, future) in waiting.items():
+            calendar_data = future.result()
+            if calendar_data is None:
+                continue
+            if 'errors' in calendar_data or (flight_min, flight_max) == (time_min, time_max):
+                calendars[calendar_id] = calendar_data
+            else:
+                calendars[calendar_id] = _slice_calendar_data(calendar_data, time_min, time_max)
+    else:
+        print(f"⚡ FreeBusy önbellek/yerel indeksten karşılandı: {len(calendar_ids)} takvim")
+
+    return calendars
 
-def check_calendar_availability(participants: List[str], date: str, duration_minutes: int) -> dict:
-    """Takvim müsaitliği kontrol et - OAuth 2.0 ile - ADK Tool Function"""
+def check_calendar_availability(participants: List[str], date: str, duration_minutes: int,
+                                search_days: int = DEFAULT_SEARCH_DAYS, max_slots: int = MAX_SLOTS,
+                                scoring_policy: str = 'default', required_participants: Optional[List[str]] = None,
+                                quorum_mode: bool = True) -> dict:
+    """Takvim müsaitliği kontrol et - OAuth 2.0 ile - ADK Tool Function
+
+    Tek FreeBusy sorgusu ile istenen tarih ve sonraki search_days günü kontrol edilir;
+    alternative_dates yalnızca gerçekten boş slotu olan günleri içerir. Gün başına en iyi
+    max_slots slot, scoring_policy ('default', 'time_of_day', 'earliest' veya kayıtlı başka bir politika) ile seçilir.
+    Herkesin boş olduğu slot yoksa ve quorum_mode açıksa, required_participants'ın boş olduğu
+    ve katılımı en yüksek slotlar eksik katılımcılarıyla birlikte quorum_slots alanında döner.
+    """
     
-    if not oauth_service.service:
+    backend = get_calendar_backend()
+    if not backend.is_available():
         return {
             'available_slots': [],
             'participants': participants,
@@ -86,27 +702,28 @@ def check_calendar_availability(participants: List[str], date: str, duration_min
         }
     
     try:
-        # Tarih aralığını hesapla
+        # Tarih aralığını hesapla - istenen gün + alternatif arama ufku
+        search_days = max(0, min(int(search_days), MAX_SEARCH_DAYS))
+        max_slots = max(1, int(max_slots))
+        organizer_email = backend.get_user_email()
+        scorer = get_scoring_policy(
+            scoring_policy, participants=participants, organizer_email=organizer_email
+        )
         start_date = datetime.strptime(date, '%Y-%m-%d')
         start_date = start_date.replace(hour=0, minute=0, second=0)
-        end_date = start_date + timedelta(days=1)
-        
-        # FreeBusy sorgusu - Türkiye saati
-        import pytz
-        turkey_tz = pytz.timezone('Europe/Istanbul')
-        start_date_tz = turkey_tz.localize(start_date)
-        end_date_tz = turkey_tz.localize(end_date)
-        
-        freebusy_query = {
-            'timeMin': start_date_tz.isoformat(),
-            'timeMax': end_date_tz.isoformat(),
-            'timeZone': 'Europe/Istanbul',
-            'items': [{'id': email} for email in participants]
-        }
+        end_date = start_date + timedelta(days=search_days + 1)
+        
+        # Katılımcı saat dilimleri/çalışma saatleri - tarih organizatörün saat diliminde yorumlanır
+        working_hours = get_working_hours([organizer_email, *participants] if organizer_email else participants)
+        organizer_hours = working_hours.pop(organizer_email, DEFAULT_WORKING_HOURS) if organizer_email else DEFAULT_WORKING_HOURS
+        
+        # FreeBusy sorgusu - organizatörün saat dilimi (varsayılan Türkiye saati)
+        organizer_tz = get_timezone(organizer_hours.timezone)
+        start_date_tz = organizer_tz.localize(start_date)
+        end_date_tz = organizer_tz.localize(end_date)
         
         print(f"🔍 OAuth 2.0: {len(participants)} katılımcı için takvim kontrolü...")
-        freebusy_result = oauth_service.service.freebusy().query(body=freebusy_query).execute()
-        busy_times = freebusy_result.get('calendars', {})
+        busy_times = query_freebusy(participants, start_date_tz, end_date_tz)
         
         # Özel takvim kontrolü - erişilemeyen takvimleri tespit et
         inaccessible_calendars = []
@@ -134,8 +751,16 @@ def check_calendar_availability(participants: List[str], date: str, duration_min
                 print(f"⚠️ {participant_email}: FreeBusy yanıtı alınamadı")
                 inaccessible_calendars.append(participant_email)
         
-        # Müsait saatleri hesapla
-        available_slots = _calculate_free_slots(busy_times, start_date, duration_minutes)
+        # Müsait saatleri hesapla - istenen gün ve hafta içi alternatif günler tek geçişte
+        candidate_dates = [start_date] + [
+            start_date + timedelta(days=i)
+            for i in range(1, search_days + 1)
+            if (start_date + timedelta(days=i)).weekday() < 5  # 0-4 hafta içi
+        ]
+        slots_by_day = calculate_free_slots_by_day(busy_times, candidate_dates, duration_minutes,
+                                                   k=max_slots, policy=scorer, working_hours=working_hours,
+                                                   organizer_hours=organizer_hours)
+        available_slots = slots_by_day[start_date.strftime('%Y-%m-%d')]
         
         # Boş takvim kontrolü ve alternatif önerileri
         no_slots_available = len(available_slots) == 0
@@ -153,17 +778,35 @@ def check_calendar_availability(participants: List[str], date: str, duration_min
         else:
             availability_message = f"✅ {len(available_slots)} müsait zaman bulundu"
         
-        # Alternatif tarih önerileri oluştur (eğer slot yoksa)
+        # Alternatif tarih önerileri - yalnızca gerçekten boş slotu olan günler (eğer slot yoksa)
         alternative_dates = []
+        alternative_slots = {}
         if no_slots_available:
-            base_date = datetime.strptime(date, '%Y-%m-%d')
-            for i in range(1, 8):  # Sonraki 7 gün
-                next_date = base_date + timedelta(days=i)
-                # Hafta sonu atla
-                if next_date.weekday() < 5:  # 0-4 hafta içi
-                    alternative_dates.append(next_date.strftime('%Y-%m-%d'))
-                if len(alternative_dates) >= 3:  # Maksimum 3 alternatif
+            for candidate_date in candidate_dates[1:]:
+                day_key = candidate_date.strftime('%Y-%m-%d')
+                if slots_by_day[day_key]:
+                    alternative_dates.append(day_key)
+                    alternative_slots[day_key] = slots_by_day[day_key]
+                if len(alternative_dates) >= MAX_ALTERNATIVE_DATES:
                     break
+            if not alternative_dates:
+                availability_message += f" Sonraki {search_days} gün içinde de uygun gün yok."
+        
+        # Quorum modu - erişilebilen takvimler üzerinde en yüksek katılımlı slotlar
+        best_quorum_slots = []
+        if no_slots_available and quorum_mode and len(accessible_calendars) > 1:
+            best_quorum_slots = quorum_slots(
+                {participant: busy_times[participant] for participant in accessible_calendars},
+                start_date, duration_minutes, required=required_participants or [],
+                k=max_slots, policy=scorer, working_hours=working_hours, organizer_hours=organizer_hours
+            )
+            if best_quorum_slots:
+                best = best_quorum_slots[0]
+                availability_message += (
+                    f" En yüksek katılım: {best['start']}-{best['end']} "
+                    f"({len(best['available_attendees'])}/{len(accessible_calendars)}, "
+                    f"eksik: {', '.join(best['missing_attendees'])})"
+                )
         
         return {
             'available_slots': available_slots,
@@ -173,11 +816,15 @@ def check_calendar_availability(participants: List[str], date: str, duration_min
             'calendar_access_warning': access_warning,
             'no_slots_available': no_slots_available,
             'alternative_dates': alternative_dates,
+            'alternative_slots': alternative_slots,
+            'quorum_slots': best_quorum_slots,
+            'search_days': search_days,
+            'timezone': organizer_hours.timezone,
             'date': date,
             'duration': duration_minutes,
             'message': f'OAuth 2.0 API: {len(accessible_calendars)} katılımcının takvimi kontrol edildi. {availability_message}{warning_message}',
             'real_data': True,
-            'oauth_user': oauth_service.user_email
+            'oauth_user': backend.get_user_email()
         }
         
     except HttpError as e:
@@ -201,10 +848,222 @@ def check_calendar_availability(participants: List[str], date: str, duration_min
             'real_data': False
         }
 
+def check_recurring_availability(participants: List[str], start_date: str, duration_minutes: int,
+                                 recurrence: str, max_slots: int = MAX_SLOTS,
+                                 scoring_policy: str = 'default') -> dict:
+    """Tekrarlayan toplantı için tüm tekrarlarda boş saatleri bul - ADK Tool Function
+
+    recurrence bir RRULE'dur (ör. 'FREQ=WEEKLY;INTERVAL=2;COUNT=6'). Serinin tamamı için tek
+    FreeBusy sorgusu yapılır; dönen slotlar her tekrarda aynı saatte herkes için boştur ve
+    create_calendar_event'e 'recurrence' alanıyla verilerek tek seri event oluşturulabilir.
+    Sonlu kurallar en fazla MAX_RECURRENCE_OCCURRENCES tekrar içerebilir; sonu olmayan kurallarda
+    yalnızca ilk MAX_RECURRENCE_OCCURRENCES tekrar kontrol edilir ve 'truncated' True döner.
+    """
+    backend = get_calendar_backend()
+    if not backend.is_available():
+        return {
+            'available_slots': [],
+            'participants': participants,
+            'date': start_date,
+            'duration': duration_minutes,
+            'message': '❌ OAuth bağlantısı yok - Lütfen önce authentication yapın',
+            'real_data': False
+        }
+    
+    try:
+        # Tekrarlar ve slotlar organizatörün saat diliminde, katılımcı çalışma saatleriyle hesaplanır
+        organizer_email = backend.get_user_email()
+        working_hours = get_working_hours([organizer_email, *participants] if organizer_email else participants)
+        organizer_hours = working_hours.pop(organizer_email, DEFAULT_WORKING_HOURS) if organizer_email else DEFAULT_WORKING_HOURS
+        organizer_tz = get_timezone(organizer_hours.timezone)
+        
+        # Sınırın bir fazlası açılır - kesilip kesilmediğini anlamak için
+        occurrence_dates = expand_recurrence(recurrence, datetime.strptime(start_date, '%Y-%m-%d'),
+                                             max_occurrences=MAX_RECURRENCE_OCCURRENCES + 1, tz=organizer_tz)
+        if not occurrence_dates:
+            raise ValueError(f"Tekrar kuralı hiç tarih üretmedi: {recurrence}")
+        truncated = len(occurrence_dates) > MAX_RECURRENCE_OCCURRENCES
+        if truncated and is_finite_rrule(recurrence):
+            raise ValueError(
+                f"Tekrar kuralı en fazla {MAX_RECURRENCE_OCCURRENCES} tekrar içerebilir "
+                f"(COUNT/UNTIL'i kısaltın): {recurrence}"
+            )
+        occurrence_dates = occurrence_dates[:MAX_RECURRENCE_OCCURRENCES]
+        
+        series_start = organizer_tz.localize(occurrence_dates[0])
+        series_end = organizer_tz.localize(occurrence_dates[-1] + timedelta(days=1))
+        
+        print(f"🔁 OAuth 2.0: {len(occurrence_dates)} tekrar için tek FreeBusy sorgusu...")
+        busy_times = query_freebusy(participants, series_start, series_end)
+        inaccessible_calendars = [
+            participant for participant in participants
+            if 'errors' in busy_times.get(participant, {}) or participant not in busy_times
+        ]
+        
+        scorer = get_scoring_policy(
+            scoring_policy, participants=participants, organizer_email=organizer_email
+        )
+        available_slots = recurring_free_slots(
+            busy_times, occurrence_dates, duration_minutes, k=max(1, int(max_slots)), policy=scorer,
+            working_hours=working_hours, organizer_hours=organizer_hours
+        )
+        
+        if available_slots:
+            message = f"✅ {len(occurrence_dates)} tekrarın tamamında boş {len(available_slots)} saat bulundu"
+        else:
+            message = f"❌ {len(occurrence_dates)} tekrarın tamamında ortak boş saat yok"
+        if truncated:
+            message += (f" ⚠️ UYARI: tekrar kuralının sonu yok - yalnızca ilk {len(occurrence_dates)} tekrar "
+                        f"kontrol edildi, sonraki tekrarlar kontrol edilmedi")
+        if inaccessible_calendars:
+            message += f" ⚠️ UYARI: {len(inaccessible_calendars)} katılımcının takvimine erişim yok: {', '.join(inaccessible_calendars)}"
+        
+        return {
+            'available_slots': available_slots,
+            'participants': participants,
+            'inaccessible_participants': inaccessible_calendars,
+            'calendar_access_warning': bool(inaccessible_calendars),
+            'no_slots_available': not available_slots,
+            'recurrence': normalize_rrule(recurrence),
+            'occurrence_dates': [day.strftime('%Y-%m-%d') for day in occurrence_dates],
+            'checked_occurrences': len(occurrence_dates),
+            'truncated': truncated,
+            'date': start_date,
+            'duration': duration_minutes,
+            'timezone': organizer_hours.timezone,
+            'message': message,
+            'real_data': True,
+            'oauth_user': backend.get_user_email()
+        }
+    
+    except Exception as e:
+        print(f"❌ Tekrarlayan müsaitlik hatası: {e}")
+        return {
+            'available_slots': [],
+            'participants': participants,
+            'date': start_date,
+            'duration': duration_minutes,
+            'message': f'❌ Calendar hatası: {str(e)}',
+            'real_data': False
+        }
+
+
+def _build_event_body(meeting_details: dict, organizer_email: str) -> Tuple[Dict, List[str], datetime, datetime]:
+    """Meeting details'dan Google Calendar event gövdesini oluştur"""
+    # Meeting details parse et
+    participants = meeting_details.get('participants', meeting_details.get('attendees', []))
+    title = meeting_details.get('title', meeting_details.get('subject', 'Toplantı'))
+    location = meeting_details.get('location', 'Online')
+    
+    # Tarih ve saat organizatörün saat diliminde - Google RRULE'u event'in timeZone'unda açar,
+    # check_recurring_availability de tekrarları bu dilimde kontrol eder
+    organizer_hours = get_working_hours([organizer_email]).get(organizer_email, DEFAULT_WORKING_HOURS) \
+        if organizer_email else DEFAULT_WORKING_HOURS
+    organizer_tz = get_timezone(organizer_hours.timezone)
+    
+    if 'start_datetime' in meeting_details and 'end_datetime' in meeting_details:
+        # ISO format datetime string'leri
+        meeting_datetime = datetime.fromisoformat(meeting_details['start_datetime'])
+        end_datetime = datetime.fromisoformat(meeting_details['end_datetime'])
+        
+        # Eğer timezone bilgisi yoksa organizatörün saatini ekle, varsa onun dilimine çevir
+        if meeting_datetime.tzinfo is None:
+            meeting_datetime = organizer_tz.localize(meeting_datetime)
+        if end_datetime.tzinfo is None:
+            end_datetime = organizer_tz.localize(end_datetime)
+        meeting_datetime = meeting_datetime.astimezone(organizer_tz)
+        end_datetime = end_datetime.astimezone(organizer_tz)
+    else:
+        # Eski format desteği
+        date = meeting_details.get('date')
+        start_time = meeting_details.get('start_time')
+        duration = meeting_details.get('duration')
+        
+        # ZORUNLU ALAN KONTROLÜ
+        if not start_time:
+            raise ValueError("⚠️ start_time zorunlu! Meeting details'da start_time eksik.")
+        if not duration:
+            raise ValueError("⚠️ duration zorunlu! Meeting details'da duration eksik.")
+        
+        # DEBUG: Duration kontrolü
+        print(f"🔍 create_calendar_event DEBUG:")
+        print(f"   - meeting_details keys: {list(meeting_details.keys())}")
+        print(f"   - duration value: {duration}")
+        print(f"   - start_time: {start_time}")
+        print(f"   - date: {date}")
+        
+        if not date:
+            raise ValueError("Meeting date is required")
+        
+        # Naive datetime oluştur ve organizatörün saatiyle localize et
+        naive_datetime = datetime.strptime(f"{date} {start_time}", '%Y-%m-%d %H:%M')
+        meeting_datetime = organizer_tz.localize(naive_datetime)
+        end_datetime = meeting_datetime + timedelta(minutes=duration)
+    
+    # Google Calendar Event objesi oluştur
+    event = {
+        'summary': title,
+        'location': location,
+        'description': f'Bu toplantı Verlumea AI Meeting Scheduler tarafından oluşturulmuştur.\n\nOrganizatör: {organizer_email}',
+        'start': {
+            'dateTime': meeting_datetime.isoformat(),
+            'timeZone': organizer_hours.timezone,
+        },
+        'end': {
+            'dateTime': end_datetime.isoformat(),
+            'timeZone': organizer_hours.timezone,
+        },
+        'attendees': [
+            {'email': email, 'responseStatus': 'needsAction'} 
+            for email in participants
+        ],
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},
+                {'method': 'popup', 'minutes': 15},
+            ],
+        },
+        'guestsCanInviteOthers': False,
+        'guestsCanModify': False,
+        'sendUpdates': 'all',
+        'visibility': 'default'
+    }
+    
+    # Tekrarlayan toplantı - tüm seri tek event olarak oluşturulur
+    recurrence = meeting_details.get('recurrence')
+    if recurrence:
+        rules = [recurrence] if isinstance(recurrence, str) else list(recurrence)
+        event['recurrence'] = [normalize_rrule(rule) for rule in rules]
+    
+    return event, participants, meeting_datetime, end_datetime
+
+
+def _event_created_result(created_event: Dict, meeting_details: dict, participants: List[str],
+                          organizer_email: str) -> dict:
+    """Başarılı event oluşturma için tool sonucu"""
+    event_id = created_event.get('id')
+    event_link = created_event.get('htmlLink')
+    
+    return {
+        'success': True,
+        'event_id': event_id,
+        'event_link': event_link,
+        'meeting_details': meeting_details,
+        'participants': participants,
+        'organizer': organizer_email,
+        'message': f'✅ OAuth 2.0 ile Calendar event başarıyla oluşturuldu! Event ID: {event_id}',
+        'calendar_created': True,
+        'notifications_sent': True,
+        'oauth_used': True
+    }
+
+
 def create_calendar_event(meeting_details: dict) -> dict:
     """OAuth 2.0 ile Calendar Event oluştur - ADK Tool Function"""
     
-    if not oauth_service.service:
+    backend = get_calendar_backend(meeting_details.get('organizer'))
+    if not backend.is_available():
         return {
             'success': False,
             'error': 'OAuth bağlantısı yok',
@@ -212,82 +1071,9 @@ def create_calendar_event(meeting_details: dict) -> dict:
         }
     
     try:
-        # Meeting details parse et
-        participants = meeting_details.get('participants', meeting_details.get('attendees', []))
-        title = meeting_details.get('title', meeting_details.get('subject', 'Toplantı'))
-        location = meeting_details.get('location', 'Online')
-        organizer_email = oauth_service.user_email
-        
-        # Tarih ve saat hesapla - Timezone düzeltmesi
-        import pytz
-        turkey_tz = pytz.timezone('Europe/Istanbul')
-        
-        if 'start_datetime' in meeting_details and 'end_datetime' in meeting_details:
-            # ISO format datetime string'leri
-            meeting_datetime = datetime.fromisoformat(meeting_details['start_datetime'])
-            end_datetime = datetime.fromisoformat(meeting_details['end_datetime'])
-            
-            # Eğer timezone bilgisi yoksa Türkiye saatini ekle
-            if meeting_datetime.tzinfo is None:
-                meeting_datetime = turkey_tz.localize(meeting_datetime)
-            if end_datetime.tzinfo is None:
-                end_datetime = turkey_tz.localize(end_datetime)
-        else:
-            # Eski format desteği
-            date = meeting_details.get('date')
-            start_time = meeting_details.get('start_time')
-            duration = meeting_details.get('duration')
-            
-            # ZORUNLU ALAN KONTROLÜ
-            if not start_time:
-                raise ValueError("⚠️ start_time zorunlu! Meeting details'da start_time eksik.")
-            if not duration:
-                raise ValueError("⚠️ duration zorunlu! Meeting details'da duration eksik.")
-            
-            # DEBUG: Duration kontrolü
-            print(f"🔍 create_calendar_event DEBUG:")
-            print(f"   - meeting_details keys: {list(meeting_details.keys())}")
-            print(f"   - duration value: {duration}")
-            print(f"   - start_time: {start_time}")
-            print(f"   - date: {date}")
-            
-            if not date:
-                raise ValueError("Meeting date is required")
-            
-            # Naive datetime oluştur ve Türkiye saatiyle localize et
-            naive_datetime = datetime.strptime(f"{date} {start_time}", '%Y-%m-%d %H:%M')
-            meeting_datetime = turkey_tz.localize(naive_datetime)
-            end_datetime = meeting_datetime + timedelta(minutes=duration)
-        
-        # Google Calendar Event objesi oluştur
-        event = {
-            'summary': title,
-            'location': location,
-            'description': f'Bu toplantı Verlumea AI Meeting Scheduler tarafından oluşturulmuştur.\n\nOrganizatör: {organizer_email}',
-            'start': {
-                'dateTime': meeting_datetime.isoformat(),
-                'timeZone': 'Europe/Istanbul',
-            },
-            'end': {
-                'dateTime': end_datetime.isoformat(),
-                'timeZone': 'Europe/Istanbul',
-            },
-            'attendees': [
-                {'email': email, 'responseStatus': 'needsAction'} 
-                for email in participants
-            ],
-            'reminders': {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60},
-                    {'method': 'popup', 'minutes': 15},
-                ],
-            },
-            'guestsCanInviteOthers': False,
-            'guestsCanModify': False,
-            'sendUpdates': 'all',
-            'visibility': 'default'
-        }
+        organizer_email = backend.get_user_email()
+        event, participants, meeting_datetime, end_datetime = _build_event_body(meeting_details, organizer_email)
+        title = event['summary']
         
         print(f"📅 OAuth 2.0 Calendar event oluşturuluyor: {title}")
         print(f"📧 Katılımcılar: {', '.join(participants)}")
@@ -295,27 +1081,12 @@ def create_calendar_event(meeting_details: dict) -> dict:
         print(f"⏰ Tarih/Saat: {meeting_datetime.strftime('%Y-%m-%d %H:%M')} - {end_datetime.strftime('%H:%M')}")
         
         # OAuth 2.0 ile GERÇEK CALENDAR EVENT CREATE!
-        created_event = oauth_service.service.events().insert(
-            calendarId='primary',
-            body=event,
-            sendUpdates='all'
-        ).execute()
+        created_event = backend.insert_event(event)
         
-        event_id = created_event.get('id')
-        event_link = created_event.get('htmlLink')
+        # Yeni event katılımcıların meşgul zamanlarını değiştirdi
+        _invalidate_busy_data([email for email in list(participants) + [organizer_email] if email])
         
-        return {
-            'success': True,
-            'event_id': event_id,
-            'event_link': event_link,
-            'meeting_details': meeting_details,
-            'participants': participants,
-            'organizer': organizer_email,
-            'message': f'✅ OAuth 2.0 ile Calendar event başarıyla oluşturuldu! Event ID: {event_id}',
-            'calendar_created': True,
-            'notifications_sent': True,
-            'oauth_used': True
-        }
+        return _event_created_result(created_event, meeting_details, participants, organizer_email)
         
     except HttpError as e:
         error_msg = f"OAuth Calendar API Event Create hatası: {e}"
@@ -334,70 +1105,138 @@ def create_calendar_event(meeting_details: dict) -> dict:
             'message': '❌ Calendar event oluşturulamadı - OAuth hatası'
         }
 
-def _calculate_free_slots(busy_times: Dict, start_date: datetime, duration_minutes: int) -> List[Dict]:
-    """Müsait zaman dilimlerini hesapla - Timezone düzeltmesi"""
-    import pytz
-    turkey_tz = pytz.timezone('Europe/Istanbul')
-    
-    # Türkiye saatiyle çalışma saatleri
-    work_start = start_date.replace(hour=9, minute=0, second=0, microsecond=0)
-    work_end = start_date.replace(hour=18, minute=0, second=0, microsecond=0)
-    
-    # Eğer timezone bilgisi yoksa Türkiye saatiyle localize et
-    if work_start.tzinfo is None:
-        work_start = turkey_tz.localize(work_start)
-        work_end = turkey_tz.localize(work_end)
-    
-    available_slots = []
-    current_time = work_start
-    
-    while current_time + timedelta(minutes=duration_minutes) <= work_end:
-        slot_end = current_time + timedelta(minutes=duration_minutes)
-        is_available = True
-        
-        for participant_email, calendar_data in busy_times.items():
-            if 'busy' in calendar_data:
-                for busy_period in calendar_data['busy']:
-                    # Google Calendar'dan gelen UTC zamanları Türkiye saatine çevir
-                    busy_start = datetime.fromisoformat(busy_period['start'].replace('Z', '+00:00'))
-                    busy_end = datetime.fromisoformat(busy_period['end'].replace('Z', '+00:00'))
-                    
-                    # UTC'den Türkiye saatine çevir
-                    busy_start = busy_start.astimezone(turkey_tz)
-                    busy_end = busy_end.astimezone(turkey_tz)
-                    
-                    if (current_time < busy_end and slot_end > busy_start):
-                        is_available = False
-                        break
-            
-            if not is_available:
-                break
-        
-        if is_available:
-            hour = current_time.hour
-            if 10 <= hour <= 11:
-                score = 0.9
-            elif 14 <= hour <= 16:
-                score = 0.8
-            elif 9 <= hour <= 10 or 11 <= hour <= 12:
-                score = 0.7
-            else:
-                score = 0.6
-            
-            available_slots.append({
-                'start': current_time.strftime('%H:%M'),
-                'end': slot_end.strftime('%H:%M'),
-                'date': start_date.strftime('%Y-%m-%d'),
-                'score': score,
-                'duration': duration_minutes,
-                'start_datetime': current_time.isoformat(),
-                'end_datetime': slot_end.isoformat()
-            })
-        
-        current_time += timedelta(minutes=30)
+def create_calendar_events(meetings: List[dict], organizer_email: Optional[str] = None) -> dict:
+    """Birden çok Calendar Event'i batch HTTP ile oluştur - ADK Tool Function"""
+    
+    backend = get_calendar_backend(organizer_email)
+    if not backend.is_available():
+        return {
+            'success': False,
+            'results': [],
+            'error': 'OAuth bağlantısı yok',
+            'message': '❌ Calendar event\'leri oluşturulamadı - OAuth authentication gerekli'
+        }
     
-    available_slots.sort(key=lambda x: x['score'], reverse=True)
-    return available_slots[:5]
+    organizer_email = backend.get_user_email()
+    results: List[Optional[dict]] = [None] * len(meetings)
+    pending = []
+    
+    # Geçersiz toplantılar batch'e girmeden hata sonucu alır
+    for index, meeting_details in enumerate(meetings):
+        try:
+            event, participants, _, _ = _build_event_body(meeting_details, organizer_email)
+            pending.append((index, event, participants))
+        except Exception as e:
+            error_msg = f"OAuth Calendar Event hatası: {e}"
+            print(f"❌ {error_msg}")
+            results[index] = {
+                'success': False,
+                'error': error_msg,
+                'message': '❌ Calendar event oluşturulamadı - OAuth hatası'
+            }
+    
+    try:
+        responses = backend.insert_events([event for _, event, _ in pending]) if pending else []
+    except Exception as e:
+        responses = [(None, e)] * len(pending)
+    
+    affected = {organizer_email} if organizer_email else set()
+    for (index, _, participants), (response, exception) in zip(pending, responses):
+        if exception is not None:
+            error_msg = f"OAuth Calendar API Event Create hatası: {exception}"
+            print(f"❌ {error_msg}")
+            results[index] = {
+                'success': False,
+                'error': error_msg,
+                'message': '❌ Calendar event oluşturulamadı - OAuth API hatası'
+            }
+        else:
+            results[index] = _event_created_result(response, meetings[index], participants, organizer_email)
+            affected.update(participants)
+    
+    # Oluşturulan event'lerin katılımcıları için önbelleği temizle
+    _invalidate_busy_data(list(affected))
+    
+    created_count = sum(1 for result in results if result and result.get('success'))
+    failed_count = len(results) - created_count
+    
+    return {
+        'success': failed_count == 0,
+        'results': results,
+        'created_count': created_count,
+        'failed_count': failed_count,
+        'message': f'📅 Batch: {created_count} event oluşturuldu, {failed_count} başarısız'
+    }
+
+# Async tool yolu - bloklayan Google API çağrıları event loop dışında çalışır
+CALENDAR_IO_WORKERS = int(os.getenv('CALENDAR_IO_WORKERS', '16'))
+
+_calendar_io_executor = None
+_calendar_io_executor_lock = threading.Lock()
+
+
+def _get_calendar_io_executor() -> ThreadPoolExecutor:
+    """Async çağrılar için paylaşılan Calendar I/O thread havuzu"""
+    global _calendar_io_executor
+    with _calendar_io_executor_lock:
+        if _calendar_io_executor is None:
+            _calendar_io_executor = ThreadPoolExecutor(
+                max_workers=CALENDAR_IO_WORKERS, thread_name_prefix='calendar-io'
+            )
+        return _calendar_io_executor
+
+
+async def _run_calendar_io(func, *args, **kwargs):
+    """Senkron Calendar fonksiyonunu I/O havuzunda çalıştır ve sonucunu bekle"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_calendar_io_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def aquery_freebusy(calendar_ids: List[str], time_min: datetime, time_max: datetime,
+                          time_zone: str = 'Europe/Istanbul', organizer_email: Optional[str] = None) -> Dict[str, Dict]:
+    """query_freebusy'nin event loop'u bloklamayan versiyonu"""
+    return await _run_calendar_io(query_freebusy, calendar_ids, time_min, time_max, time_zone, organizer_email)
+
+
+async def acheck_calendar_availability(participants: List[str], date: str, duration_minutes: int,
+                                       search_days: int = DEFAULT_SEARCH_DAYS, max_slots: int = MAX_SLOTS,
+                                       scoring_policy: str = 'default',
+                                       required_participants: Optional[List[str]] = None,
+                                       quorum_mode: bool = True) -> dict:
+    """check_calendar_availability'nin event loop'u bloklamayan versiyonu"""
+    return await _run_calendar_io(
+        check_calendar_availability, participants, date, duration_minutes, search_days,
+        max_slots, scoring_policy, required_participants, quorum_mode
+    )
+
+
+async def acheck_recurring_availability(participants: List[str], start_date: str, duration_minutes: int,
+                                        recurrence: str, max_slots: int = MAX_SLOTS,
+                                        scoring_policy: str = 'default') -> dict:
+    """check_recurring_availability'nin event loop'u bloklamayan versiyonu"""
+    return await _run_calendar_io(
+        check_recurring_availability, participants, start_date, duration_minutes, recurrence,
+        max_slots, scoring_policy
+    )
+
+
+async def acreate_calendar_event(meeting_details: dict) -> dict:
+    """create_calendar_event'in event loop'u bloklamayan versiyonu"""
+    return await _run_calendar_io(create_calendar_event, meeting_details)
+
+
+async def acreate_calendar_events(meetings: List[dict], organizer_email: Optional[str] = None) -> dict:
+    """create_calendar_events'in event loop'u bloklamayan versiyonu"""
+    return await _run_calendar_io(create_calendar_events, meetings, organizer_email)
+
+
+def _calculate_free_slots(busy_times: Dict, start_date: datetime, duration_minutes: int,
+                          k: int = MAX_SLOTS, policy: str = 'default', working_hours: Optional[Dict] = None,
+                          organizer_hours=DEFAULT_WORKING_HOURS) -> List[Dict]:
+    """Müsait zaman dilimlerini hesapla - UTC dakika üzerinde interval-sweep, heap ile en iyi k slot"""
+    return calculate_free_slots(busy_times, start_date, duration_minutes, k, policy, working_hours, organizer_hours)
 
 
 def create_calendar_agent():
@@ -430,11 +1269,15 @@ YENİ ÖZELLİKLER:
 ÖNEMLI:
 - check_calendar_availability tool'unu kullan
 - create_calendar_event tool'unu kullan
+- Çok sayıda toplantı için (onboarding serisi, mülakat döngüsü) create_calendar_events tool'unu kullan
+- Haftalık/iki haftalık seriler için check_recurring_availability ile tek sorguda ortak saati bul,
+  create_calendar_event'e 'recurrence' (RRULE) vererek seriyi tek event olarak oluştur
+  ('truncated' True ise kullanıcıya yalnızca ilk 'checked_occurrences' tekrarın kontrol edildiğini söyle)
 - OAuth authentication gerekli (ilk kullanımda browser açılır)
 - Event oluştururken event_id ve link döndür
 - Katılımcılara GERÇEK Calendar daveti gider
 """,
-        tools=[check_calendar_availability, create_calendar_event]
+        tools=[check_calendar_availability, check_recurring_availability, create_calendar_event, create_calendar_events]
     )
     
     return calendar_agent
@@ -445,11 +1288,18 @@ class CalendarAnalyst:
     def __init__(self):
         self.agent = create_calendar_agent()
     
-    async def check_availability(self, participants: List[str], date: str, duration: int) -> List[dict]:
+    async def check_availability(self, participants: List[str], date: str, duration: int,
+                                 max_slots: int = MAX_SLOTS, scoring_policy: str = 'default') -> List[dict]:
         """Müsaitlik kontrolü - OAuth 2.0"""
-        result = check_calendar_availability(participants, date, duration)
+        result = await acheck_calendar_availability(
+            participants, date, duration, max_slots=max_slots, scoring_policy=scoring_policy
+        )
         return result.get('available_slots', [])
     
     async def create_event(self, meeting_details: dict) -> dict:
         """Calendar event oluştur - OAuth 2.0"""
-        return create_calendar_event(meeting_details)
\ No newline at end of file
+        return await acreate_calendar_event(meeting_details)
+    
+    async def create_events(self, meetings: List[dict]) -> dict:
+        """Birden çok Calendar event'i batch ile oluştur - OAuth 2.0"""
+        return await acreate_calendar_events(meetings)
\ No newline at end of file
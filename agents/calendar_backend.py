@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Calendar Backend Arayüzü - Google dışı sağlayıcılar ve offline benchmark için
+"""
+
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from .availability import expand_recurrence, get_timezone
+
+
+class CalendarBackend(Protocol):
+    """Tool fonksiyonlarının kullandığı takvim sağlayıcı protokolü"""
+
+    def is_available(self) -> bool:
+        """Backend kullanıma hazır mı (ör. OAuth tamamlandı mı)"""
+        ...
+
+    def get_user_email(self) -> Optional[str]:
+        """Organizatörün (backend sahibinin) email adresi"""
+        ...
+
+    def query_freebusy(self, calendar_ids: List[str], time_min: datetime, time_max: datetime,
+                       time_zone: str) -> Dict[str, Dict]:
+        """FreeBusy 'calendars' haritası: {takvim id: {'busy': [...]} veya {'errors': [...]}}"""
+        ...
+
+    def insert_event(self, event: Dict) -> Dict:
+        """Tek event oluştur, Google Calendar event yanıtı biçiminde döndür"""
+        ...
+
+    def insert_events(self, events: List[Dict]) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """Toplu event oluştur - her event için (yanıt, hata) çifti"""
+        ...
+
+    def list_events(self, calendar_id: str, sync_token: Optional[str] = None,
+                    page_token: Optional[str] = None) -> Dict:
+        """events.list yanıtı - 'items', 'nextPageToken' / 'nextSyncToken' (artımlı senkronizasyon)"""
+        ...
+
+
+class InMemoryCalendarBackend:
+    """Bellek içi sahte takvim sağlayıcısı - sentetik takvimler ve gecikme enjeksiyonu ile"""
+
+    def __init__(self, calendars: Optional[Dict[str, List[Tuple[datetime, datetime]]]] = None,
+                 user_email: str = 'organizer@example.com',
+                 latency_seconds: float = 0.0, latency_jitter_seconds: float = 0.0,
+                 private_calendars: Optional[List[str]] = None):
+        self.user_email = user_email
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.private_calendars = set(private_calendars or [])
+        self.calendars: Dict[str, List[Tuple[datetime, datetime]]] = {}
+        self.events: Dict[str, Dict] = {}
+        self._calendar_events: Dict[str, List[Tuple[int, Dict]]] = {}
+        self._change_seq = 0
+        self.stats = {'freebusy_queries': 0, 'events_inserted': 0}
+        self._lock = threading.Lock()
+
+        for calendar_id, busy_periods in (calendars or {}).items():
+            for busy_start, busy_end in busy_periods:
+                self.add_busy(calendar_id, busy_start, busy_end)
+
+    @classmethod
+    def with_synthetic_calendars(cls, participants: List[str], start_date: datetime, days: int = 7,
+                                 blocks_per_day: int = 4, seed: Optional[int] = None,
+                                 **kwargs) -> 'InMemoryCalendarBackend':
+        """Katılımcılar için 08:00-19:00 arasında rastgele meşgul bloklarla doldurulmuş backend"""
+        rng = random.Random(seed)
+        backend = cls(**kwargs)
+        for participant in participants:
+            for day in range(days):
+                day_start = start_date + timedelta(days=day)
+                for _ in range(blocks_per_day):
+                    block_start = day_start.replace(hour=8, minute=0, second=0, microsecond=0) + \
+                        timedelta(minutes=rng.randrange(0, 11 * 60, 15))
+                    block_end = block_start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))
+                    backend.add_busy(participant, block_start, block_end)
+        return backend
+
+    def add_busy(self, calendar_id: str, busy_start: datetime, busy_end: datetime):
+        """Takvime meşgul blok ekle (timezone bilgili datetime)"""
+        event = {
+            'id': uuid.uuid4().hex,
+            'status': 'confirmed',
+            'start': {'dateTime': busy_start.isoformat()},
+            'end': {'dateTime': busy_end.isoformat()}
+        }
+        with self._lock:
+            self.calendars.setdefault(calendar_id, []).append((busy_start, busy_end))
+            self._record_change(calendar_id, event)
+
+    def _record_change(self, calendar_id: str, event: Dict):
+        """Artımlı senkronizasyon için değişiklik günlüğü (lock altında çağrılır)"""
+        self._change_seq += 1
+        self._calendar_events.setdefault(calendar_id, []).append((self._change_seq, event))
+
+    def _simulate_latency(self):
+        delay = self.latency_seconds
+        if self.latency_jitter_seconds:
+            delay += random.uniform(0, self.latency_jitter_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_user_email(self) -> Optional[str]:
+        return self.user_email
+
+    def query_freebusy(self, calendar_ids: List[str], time_min: datetime, time_max: datetime,
+                       time_zone: str = 'Europe/Istanbul') -> Dict[str, Dict]:
+        self._simulate_latency()
+        calendars = {}
+        with self._lock:
+            self.stats['freebusy_queries'] += 1
+            for calendar_id in calendar_ids:
+                if calendar_id in self.private_calendars:
+                    calendars[calendar_id] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+                    continue
+                calendars[calendar_id] = {
+                    'busy': [
+                        {'start': max(busy_start, time_min).isoformat(), 'end': min(busy_end, time_max).isoformat()}
+                        for busy_start, busy_end in sorted(self.calendars.get(calendar_id, []))
+                        if busy_end > time_min and busy_start < time_max
+                    ]
+                }
+        return calendars
+
+    def insert_event(self, event: Dict) -> Dict:
+        self._simulate_latency()
+        return self._store_event(event)
+
+    def insert_events(self, events: List[Dict]) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        # Batch tek round trip gibi davranır
+        self._simulate_latency()
+        results = []
+        for event in events:
+            try:
+                results.append((self._store_event(event), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def _store_event(self, event: Dict) -> Dict:
+        event_start = datetime.fromisoformat(event['start']['dateTime'])
+        event_end = datetime.fromisoformat(event['end']['dateTime'])
+        event_id = uuid.uuid4().hex
+        attendees = [attendee['email'] for attendee in event.get('attendees', [])]
+
+        # Tekrarlayan event'ler her tekrar için meşgul blok olarak açılır - Google gibi event'in
+        # timeZone'unda aynı yerel saatte (yaz saati geçişlerinde UTC ofseti değişir)
+        occurrences = [(event_start, event_end)]
+        time_zone = event['start'].get('timeZone')
+        tz = get_timezone(time_zone) if time_zone else event_start.tzinfo
+        local_start = event_start.astimezone(tz)
+        for rule in event.get('recurrence', []):
+            occurrences = []
+            for day in expand_recurrence(rule, local_start, tz=tz):
+                wall_clock = datetime.combine(day.date(), local_start.time())
+                occurrence_start = tz.localize(wall_clock) if hasattr(tz, 'localize') else wall_clock.replace(tzinfo=tz)
+                occurrences.append((occurrence_start, occurrence_start + (event_end - event_start)))
+
+        with self._lock:
+            self.stats['events_inserted'] += 1
+            self.events[event_id] = dict(event, id=event_id)
+            for calendar_id in attendees + [self.user_email]:
+                self.calendars.setdefault(calendar_id, []).extend(occurrences)
+                self._record_change(calendar_id, self.events[event_id])
+
+        return {'id': event_id, 'htmlLink': f'memory://calendar/event/{event_id}', 'status': 'confirmed'}
+
+    def list_events(self, calendar_id: str, sync_token: Optional[str] = None,
+                    page_token: Optional[str] = None) -> Dict:
+        self._simulate_latency()
+        since = int(sync_token) if sync_token else 0
+        with self._lock:
+            items = [event for seq, event in self._calendar_events.get(calendar_id, []) if seq > since]
+            return {'items': items, 'nextSyncToken': str(self._change_seq), 'timeZone': 'Europe/Istanbul'}
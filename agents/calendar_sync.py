@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Calendar Sync Engine - events.list sync token'ları ile yerel meşgul zaman indeksi
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import pytz
+
+
+def _event_busy_interval(event: Dict, calendar_tz) -> Optional[Tuple[datetime, datetime]]:
+    """Event'i meşgul aralığa çevir - iptal, 'transparent' ve reddedilmiş event'ler meşgul sayılmaz"""
+    if event.get('status') == 'cancelled' or event.get('transparency') == 'transparent':
+        return None
+    for attendee in event.get('attendees', []):
+        if attendee.get('self') and attendee.get('responseStatus') == 'declined':
+            return None
+
+    start, end = event.get('start', {}), event.get('end', {})
+    if 'dateTime' in start and 'dateTime' in end:
+        return (
+            datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')),
+            datetime.fromisoformat(end['dateTime'].replace('Z', '+00:00'))
+        )
+    if 'date' in start and 'date' in end:
+        # Tüm gün event'i - takvimin kendi saat diliminde gece yarısından gece yarısına
+        return (
+            calendar_tz.localize(datetime.strptime(start['date'], '%Y-%m-%d')),
+            calendar_tz.localize(datetime.strptime(end['date'], '%Y-%m-%d'))
+        )
+    return None
+
+
+class _CalendarState:
+    """Tek takvimin senkronizasyon durumu ve meşgul aralıkları"""
+
+    def __init__(self):
+        self.sync_token: Optional[str] = None
+        self.last_synced: Optional[float] = None
+        self.busy_by_event: Dict[str, Tuple[datetime, datetime]] = {}
+        self.sorted_busy: List[Tuple[datetime, datetime]] = []
+        self.max_busy_length = timedelta(0)
+        self.dirty = False
+
+    def rebuild(self):
+        """Sorgular için başlangıca göre sıralı listeyi yeniden oluştur"""
+        self.sorted_busy = sorted(self.busy_by_event.values())
+        self.max_busy_length = max(
+            (busy_end - busy_start for busy_start, busy_end in self.sorted_busy),
+            default=timedelta(0)
+        )
+        self.dirty = False
+
+
+class CalendarSyncIndex:
+    """Kurum içi takvimler için artımlı (sync token) güncellenen yerel meşgul zaman indeksi"""
+
+    def __init__(self, backend_provider: Callable, calendar_ids: List[str],
+                 max_staleness_seconds: float = 300, refresh_interval_seconds: float = 60,
+                 default_timezone: str = 'Europe/Istanbul'):
+        self._backend_provider = backend_provider
+        self.calendar_ids = list(calendar_ids)
+        self.max_staleness_seconds = max_staleness_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.default_timezone = default_timezone
+        self._states: Dict[str, _CalendarState] = {calendar_id: _CalendarState() for calendar_id in self.calendar_ids}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync_calendar(self, calendar_id: str):
+        """Takvimi senkronize et - token varsa artımlı, yoksa (veya 410 Gone ise) tam senkronizasyon"""
+        backend = self._backend_provider()
+        state = self._states[calendar_id]
+
+        sync_token = state.sync_token
+        changes: Dict[str, Optional[Tuple[datetime, datetime]]] = {}
+        page_token = None
+        full_sync = sync_token is None
+
+        while True:
+            try:
+                response = backend.list_events(calendar_id, sync_token=sync_token, page_token=page_token)
+            except Exception as e:
+                # Sync token süresi dolmuş (410 Gone) - tam senkronizasyona dön
+                if sync_token is not None and getattr(getattr(e, 'resp', None), 'status', None) == 410:
+                    print(f"🔄 {calendar_id}: sync token geçersiz, tam senkronizasyon yapılıyor")
+                    sync_token, page_token, full_sync = None, None, True
+                    changes.clear()
+                    continue
+                raise
+
+            calendar_tz = pytz.timezone(response.get('timeZone') or self.default_timezone)
+            for event in response.get('items', []):
+                changes[event['id']] = _event_busy_interval(event, calendar_tz)
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                next_sync_token = response.get('nextSyncToken')
+                break
+
+        with self._lock:
+            if full_sync:
+                state.busy_by_event.clear()
+            for event_id, interval in changes.items():
+                if interval is None:
+                    state.busy_by_event.pop(event_id, None)
+                else:
+                    state.busy_by_event[event_id] = interval
+            state.sync_token = next_sync_token
+            state.last_synced = time.monotonic()
+            state.dirty = True
+
+    def sync_all(self):
+        """Tüm takvimleri senkronize et - hatalı takvim diğerlerini engellemez"""
+        for calendar_id in self.calendar_ids:
+            try:
+                self.sync_calendar(calendar_id)
+            except Exception as e:
+                print(f"⚠️ {calendar_id}: takvim senkronizasyon hatası - {e}")
+
+    def is_fresh(self, calendar_id: str) -> bool:
+        """Takvim indekste ve son senkronizasyon yeterince yeni mi"""
+        state = self._states.get(calendar_id)
+        if state is None or state.last_synced is None:
+            return False
+        return time.monotonic() - state.last_synced <= self.max_staleness_seconds
+
+    def invalidate(self, calendar_ids: List[str]):
+        """Takvimleri bir sonraki senkronizasyona kadar bayat işaretle (FreeBusy'ye düşülür)"""
+        with self._lock:
+            for calendar_id in calendar_ids:
+                state = self._states.get(calendar_id)
+                if state is not None:
+                    state.last_synced = None
+
+    def freebusy(self, calendar_id: str, time_min: datetime, time_max: datetime) -> Dict:
+        """FreeBusy yanıtı biçiminde, pencere ile kırpılmış birleştirilmiş meşgul bloklar"""
+        with self._lock:
+            state = self._states[calendar_id]
+            if state.dirty:
+                state.rebuild()
+            sorted_busy = state.sorted_busy
+            first = bisect_left(sorted_busy, (time_min - state.max_busy_length,))
+
+            busy = []
+            for busy_start, busy_end in sorted_busy[first:]:
+                if busy_start >= time_max:
+                    break
+                if busy_end <= time_min:
+                    continue
+                busy_start, busy_end = max(busy_start, time_min), min(busy_end, time_max)
+                if busy and busy_start <= busy[-1][1]:
+                    busy[-1] = (busy[-1][0], max(busy[-1][1], busy_end))
+                else:
+                    busy.append((busy_start, busy_end))
+
+        return {'busy': [{'start': busy_start.isoformat(), 'end': busy_end.isoformat()} for busy_start, busy_end in busy]}
+
+    def start(self):
+        """Arka planda periyodik senkronizasyon başlat"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='calendar-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arka plan senkronizasyonunu durdur"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.sync_all()
+            self._stop_event.wait(self.refresh_interval_seconds)
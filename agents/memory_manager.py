@@ -3,12 +3,54 @@
 Memory & Context Management for Meeting Scheduler Agents
 """
 
+import atexit
+import bisect
+import heapq
 import json
+import math
 import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import OrderedDict
+
+# Tercih edilen zaman histogramları için gün dilimi genişliği (30 dk -> günde 48 dilim)
+TIME_BUCKET_MINUTES = 30
+TIME_BUCKETS_PER_DAY = 24 * 60 // TIME_BUCKET_MINUTES
+
+
+# Journal bu kadar kayda ulaşınca snapshot'a sıkıştırılır
+JOURNAL_COMPACT_EVERY = int(os.getenv('MEMORY_JOURNAL_COMPACT_EVERY', '500'))
+
+# Yazma birleştirme politikası - ilk kirli değişiklikten en geç bu kadar saniye sonra
+# veya bu kadar değişiklik biriktiğinde diske yazılır
+FLUSH_MAX_DELAY_SECONDS = float(os.getenv('MEMORY_FLUSH_MAX_DELAY', '1.0'))
+FLUSH_MAX_DIRTY_OPS = int(os.getenv('MEMORY_FLUSH_MAX_DIRTY_OPS', '20'))
+
+# Konuşma geçmişinde tutulan tur sayısı
+MAX_CONVERSATION_TURNS = 50
+
+
+def _flush_at_exit(manager_ref):
+    """Kapanışta bekleyen değişiklikleri yaz (manager hâlâ yaşıyorsa)"""
+    manager = manager_ref()
+    if manager is not None:
+        manager.flush()
+
+
+def _time_bucket(time_str: str) -> Optional[int]:
+    """'HH:MM' saatini gün dilimi indeksine çevir - geçersizse None"""
+    try:
+        hour, minute = (int(part) for part in time_str.split(':')[:2])
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return (hour * 60 + minute) // TIME_BUCKET_MINUTES
 
 
 @dataclass
@@ -36,16 +78,70 @@ class UserProfile:
     meeting_preferences: Dict[str, Any] = None
     last_interaction: Optional[str] = None
     total_meetings_scheduled: int = 0
+    working_hours: Dict[str, str] = None
+    # Organize edilen toplantılar üzerinde artımlı sayaçlar - None ise geçmişten yeniden hesaplanır
+    meeting_stats: Dict[str, Any] = None
     
     def __post_init__(self):
         if self.preferred_meeting_times is None:
             self.preferred_meeting_times = ["10:00", "14:00", "15:00"]
+        if self.working_hours is None:
+            self.working_hours = {"start": "09:00", "end": "18:00"}
         if self.frequent_participants is None:
             self.frequent_participants = []
         if self.meeting_preferences is None:
             self.meeting_preferences = {}
 
 
+def _empty_meeting_stats() -> Dict[str, Any]:
+    return {
+        'meeting_count': 0,
+        'duration_count': 0,
+        'duration_sum': 0,
+        'duration_counts': {},
+        'time_counts': {},
+        'participant_counts': {}
+    }
+
+
+def _coerce_duration(value) -> Optional[float]:
+    """Serbest biçimli süreyi (60, '60', 45.0) sayıya çevir - geçersizse None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        duration = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(duration):
+        return None
+    return int(duration) if duration.is_integer() else duration
+
+
+def _add_meeting_stats(stats: Dict[str, Any], meeting: 'MeetingMemory'):
+    """Toplantıyı organizatörün sayaçlarına ekle - geçersiz alanlar sayaçlara girmez, hata fırlatılmaz
+
+    JSON anahtarı olsun diye süre json.dumps ile saklanır.
+    """
+    stats['meeting_count'] += 1
+    duration = _coerce_duration(meeting.duration)
+    if duration is not None:
+        stats['duration_count'] += 1
+        stats['duration_sum'] += duration
+        duration_key = json.dumps(duration)
+        stats['duration_counts'][duration_key] = stats['duration_counts'].get(duration_key, 0) + 1
+    if meeting.time and isinstance(meeting.time, str):
+        stats['time_counts'][meeting.time] = stats['time_counts'].get(meeting.time, 0) + 1
+    participant_counts = stats['participant_counts']
+    for participant in meeting.participants or ():
+        if isinstance(participant, str):
+            participant_counts[participant] = participant_counts.get(participant, 0) + 1
+
+
+def _meeting_stats_valid(stats: Optional[Dict[str, Any]]) -> bool:
+    """Kaydedilmiş sayaçlar bu sürümün biçiminde mi (eski kayıtlarda duration_count yoktur)"""
+    return stats is not None and 'duration_count' in stats
+
+
 @dataclass
 class MeetingMemory:
     """Toplantı hafıza kaydı"""
@@ -65,19 +161,45 @@ class MeetingMemory:
 class MemoryManager:
     """Toplantı planlayıcı için hafıza ve context yönetimi"""
     
-    def __init__(self, memory_file: str = "memory_data.json"):
+    def __init__(self, memory_file: str = "memory_data.json", compact_every: int = JOURNAL_COMPACT_EVERY,
+                 flush_max_delay: float = FLUSH_MAX_DELAY_SECONDS, flush_max_dirty_ops: int = FLUSH_MAX_DIRTY_OPS):
         self.memory_file = memory_file
+        # Snapshot (memory_file) + değişiklik journal'ı (append-only JSONL)
+        self.journal_file = f"{os.path.splitext(memory_file)[0]}.journal.jsonl"
+        self.compact_every = compact_every
+        self._journal_seq = 0
+        self._journal_entries = 0
+        # Henüz yazılmamış değişiklikler - aynı profilin tekrar güncellemeleri tek kayda iner
+        self.flush_max_delay = flush_max_delay
+        self.flush_max_dirty_ops = flush_max_dirty_ops
+        self._pending_records: List[tuple] = []
+        self._pending_profiles: "OrderedDict[str, UserProfile]" = OrderedDict()
+        self._dirty_ops = 0
+        self._transaction_depth = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._write_lock = threading.RLock()
+        atexit.register(_flush_at_exit, weakref.ref(self))
         self.conversation_history: List[ConversationTurn] = []
         self.user_profiles: Dict[str, UserProfile] = {}
         self.meeting_history: List[MeetingMemory] = []
         self.current_context: Dict[str, Any] = {}
         self.session_data: Dict[str, Any] = {}
+        # Kişi başına toplantı saati histogramları (organizatör + katılımcılar) - türetilmiş, kaydedilmez
+        self.time_histograms: Dict[str, List[int]] = {}
+        # meeting_history üzerinde ters indeksler (değerler listedeki pozisyonlar) - türetilmiş, kaydedilmez
+        self._meetings_by_participant: Dict[str, List[int]] = {}
+        self._meetings_by_organizer: Dict[str, List[int]] = {}
+        # Kişi başına (created_at, -pozisyon) sıralı listesi - bisect ile tarih aralığı sorgusu
+        self._meetings_by_user_created: Dict[str, List[Tuple[str, int]]] = {}
         
         # Dosyadan hafıza yükle
         self._load_memory()
+        self._rebuild_time_histograms()
+        self._rebuild_meeting_indexes()
+        self._refresh_meeting_stats()
     
     def _load_memory(self):
-        """Hafızayı dosyadan yükle"""
+        """Hafızayı snapshot'tan yükle ve journal'daki değişiklikleri üzerine uygula"""
         if os.path.exists(self.memory_file):
             try:
                 with open(self.memory_file, 'r', encoding='utf-8') as f:
@@ -98,6 +220,7 @@ class MemoryManager:
                 self.meeting_history = [
                     MeetingMemory(**meeting) for meeting in data.get('meeting_history', [])
                 ]
+                self._journal_seq = data.get('journal_seq', 0)
                 
                 print("💾 Hafıza başarıyla yüklendi")
                 
@@ -106,6 +229,53 @@ class MemoryManager:
                 self._initialize_empty_memory()
         else:
             self._initialize_empty_memory()
+        
+        self._replay_journal()
+    
+    def _replay_journal(self):
+        """Snapshot'tan sonra journal'a yazılmış değişiklikleri sırayla uygula"""
+        if not os.path.exists(self.journal_file):
+            return
+        
+        snapshot_seq = self._journal_seq
+        replayed = 0
+        corrupted = False
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Yarım yazılmış son satır (çökme) - atlanır
+                    print("⚠️ Journal'da bozuk kayıt atlandı")
+                    corrupted = True
+                    continue
+                self._journal_entries += 1
+                # Sıkıştırma sırasında çökme olduysa snapshot'taki kayıtlar tekrar uygulanmaz
+                if record['seq'] <= snapshot_seq:
+                    continue
+                self._apply_record(record)
+                self._journal_seq = record['seq']
+                replayed += 1
+        
+        if replayed:
+            print(f"💾 Journal'dan {replayed} değişiklik uygulandı")
+        if corrupted:
+            # Yeni kayıtlar yarım satırın devamına yazılmasın diye hemen sıkıştır
+            self.save_memory()
+    
+    def _apply_record(self, record: Dict[str, Any]):
+        """Tek journal kaydını bellekteki duruma uygula"""
+        op, data = record['op'], record['data']
+        if op == 'turn':
+            self.conversation_history.append(ConversationTurn(**data))
+            if len(self.conversation_history) > MAX_CONVERSATION_TURNS:
+                self.conversation_history = self.conversation_history[-MAX_CONVERSATION_TURNS:]
+        elif op == 'profile':
+            self.user_profiles[data['user_id']] = UserProfile(**data)
+        elif op == 'meeting':
+            self.meeting_history.append(MeetingMemory(**data))
     
     def _initialize_empty_memory(self):
         """Boş hafıza başlat"""
@@ -114,26 +284,124 @@ class MemoryManager:
         self.meeting_history = []
         print("💾 Yeni hafıza başlatıldı")
     
-    def save_memory(self):
-        """Hafızayı dosyaya kaydet"""
+    def _journal(self, op: str, item):
+        """Değişikliği bekleyen yazmalara ekle - politika izin veriyorsa hemen, yoksa gecikmeli yazılır"""
+        with self._write_lock:
+            if op == 'profile':
+                self._pending_profiles[item.user_id] = item
+                self._pending_profiles.move_to_end(item.user_id)
+            else:
+                self._pending_records.append((op, item))
+            self._dirty_ops += 1
+            
+            # Transaction içinde yazma, en dıştaki transaction bitince tek seferde yapılır
+            if self._transaction_depth:
+                return
+            if self._dirty_ops >= self.flush_max_dirty_ops or self.flush_max_delay <= 0:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_max_delay, self._flush_from_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    @contextmanager
+    def transaction(self):
+        """İlgili değişiklikleri gruplayıp çıkışta tek bir journal yazması ile kalıcı yap"""
+        with self._write_lock:
+            self._transaction_depth += 1
         try:
-            data = {
-                'conversation_history': [asdict(turn) for turn in self.conversation_history],
-                'user_profiles': {
-                    user_id: asdict(profile) 
-                    for user_id, profile in self.user_profiles.items()
-                },
-                'meeting_history': [asdict(meeting) for meeting in self.meeting_history],
-                'last_updated': datetime.now().isoformat()
-            }
+            yield self
+        finally:
+            with self._write_lock:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0 and self._dirty_ops:
+                    self.flush()
+    
+    def _flush_from_timer(self):
+        """Zamanlayıcı tetiklemesi - açık transaction varsa yazmayı transaction çıkışına bırak"""
+        with self._write_lock:
+            if self._flush_timer is threading.current_thread():
+                self._flush_timer = None
+            if self._transaction_depth:
+                return
+            self.flush()
+    
+    def flush(self):
+        """Bekleyen değişiklikleri tek append ile journal'a yaz"""
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty_ops:
+                return
+            
+            items = self._pending_records + [('profile', profile) for profile in self._pending_profiles.values()]
+            self._pending_records = []
+            self._pending_profiles.clear()
+            self._dirty_ops = 0
+            self._write_records(items)
+    
+    def _write_records(self, items: List[tuple]):
+        """(op, nesne) kayıtlarını tek append ile journal'a yaz - eşiği geçince snapshot'a sıkıştır"""
+        lines = []
+        for op, item in items:
+            self._journal_seq += 1
+            record = {'seq': self._journal_seq, 'op': op, 'data': asdict(item)}
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        
+        try:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_entries += len(lines)
+        except Exception as e:
+            print(f"❌ Hafıza journal yazma hatası: {e}")
+            return
+        
+        if self._journal_entries >= self.compact_every:
+            self.save_memory()
+    
+    def save_memory(self):
+        """Tam snapshot yaz ve journal'ı sıfırla (sıkıştırma) - bekleyen değişiklikler snapshot'a dahildir"""
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending_records = []
+            self._pending_profiles.clear()
+            self._dirty_ops = 0
+            try:
+                data = {
+                    'conversation_history': [asdict(turn) for turn in self.conversation_history],
+                    'user_profiles': {
+                        user_id: asdict(profile) 
+                        for user_id, profile in self.user_profiles.items()
+                    },
+                    'meeting_history': [asdict(meeting) for meeting in self.meeting_history],
+                    'journal_seq': self._journal_seq,
+                    'last_updated': datetime.now().isoformat()
+                }
+            
+                # Önce snapshot atomik olarak değiştirilir, sonra journal kesilir
+                snapshot_dir = os.path.dirname(os.path.abspath(self.memory_file))
+                fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix='.memory-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    os.replace(tmp_path, self.memory_file)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
             
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                open(self.journal_file, 'w').close()
+                self._journal_entries = 0
                 
-            print("💾 Hafıza kaydedildi")
+                print("💾 Hafıza kaydedildi")
             
-        except Exception as e:
-            print(f"❌ Hafıza kaydetme hatası: {e}")
+            except Exception as e:
+                print(f"❌ Hafıza kaydetme hatası: {e}")
     
     def add_conversation_turn(self, user_input: str, agent_response: str, 
                             parsed_data: Dict[str, Any], success: bool,
@@ -152,10 +420,10 @@ class MemoryManager:
         self.conversation_history.append(turn)
         
         # Son 50 konuşmayı tut (hafıza optimizasyonu)
-        if len(self.conversation_history) > 50:
-            self.conversation_history = self.conversation_history[-50:]
+        if len(self.conversation_history) > MAX_CONVERSATION_TURNS:
+            self.conversation_history = self.conversation_history[-MAX_CONVERSATION_TURNS:]
         
-        self.save_memory()
+        self._journal('turn', turn)
     
     def get_or_create_user_profile(self, user_email: str) -> UserProfile:
         """Kullanıcı profilini getir veya oluştur"""
@@ -163,8 +431,10 @@ class MemoryManager:
             self.user_profiles[user_email] = UserProfile(
                 user_id=user_email,
                 email=user_email,
-                last_interaction=datetime.now().isoformat()
+                last_interaction=datetime.now().isoformat(),
+                meeting_stats=_empty_meeting_stats()
             )
+            self._journal('profile', self.user_profiles[user_email])
         else:
             self.user_profiles[user_email].last_interaction = datetime.now().isoformat()
         
@@ -186,7 +456,10 @@ class MemoryManager:
         if 'timezone' in preferences:
             profile.timezone = preferences['timezone']
         
-        self.save_memory()
+        if 'working_hours' in preferences:
+            profile.working_hours = preferences['working_hours']
+        
+        self._journal('profile', profile)
     
     def add_frequent_participant(self, user_email: str, participant_email: str):
         """Sık kullanılan katılımcı ekle"""
@@ -199,7 +472,7 @@ class MemoryManager:
         if len(profile.frequent_participants) > 10:
             profile.frequent_participants = profile.frequent_participants[-10:]
         
-        self.save_memory()
+        self._journal('profile', profile)
     
     def add_meeting_to_history(self, meeting_data: Dict[str, Any]) -> str:
         """Toplantıyı hafızaya ekle"""
@@ -219,45 +492,140 @@ class MemoryManager:
             notes=meeting_data.get('notes')
         )
         
-        self.meeting_history.append(meeting)
+        self._remember_meeting(meeting)
+        self._journal('meeting', meeting)
         
         # Kullanıcı toplantı sayısını artır
         organizer_profile = self.get_or_create_user_profile(meeting.organizer)
         organizer_profile.total_meetings_scheduled += 1
+        _add_meeting_stats(organizer_profile.meeting_stats, meeting)
         
-        # Sık kullanılan katılımcıları güncelle
+        # Sık kullanılan katılımcıları güncelle (add_frequent_participant ile aynı sırada kırpılır)
+        # - profil tek kayıtla journal'a yazılır
         for participant in meeting.participants:
-            self.add_frequent_participant(meeting.organizer, participant)
+            if participant not in organizer_profile.frequent_participants:
+                organizer_profile.frequent_participants.append(participant)
+            if len(organizer_profile.frequent_participants) > 10:
+                organizer_profile.frequent_participants = organizer_profile.frequent_participants[-10:]
         
-        self.save_memory()
+        self._journal('profile', organizer_profile)
         return meeting_id
     
+    def _remember_meeting(self, meeting: MeetingMemory):
+        """Yeni toplantıyı bellekteki geçmişe ve türetilmiş yapılara ekle"""
+        self.meeting_history.append(meeting)
+        self._record_meeting_time(meeting)
+        self._index_meeting(len(self.meeting_history) - 1, meeting)
+    
+    def _index_meeting(self, position: int, meeting: MeetingMemory):
+        """Toplantıyı katılımcı, organizatör ve tarih indekslerine ekle"""
+        for participant in set(meeting.participants):
+            self._meetings_by_participant.setdefault(participant, []).append(position)
+        self._meetings_by_organizer.setdefault(meeting.organizer, []).append(position)
+        
+        # Yeni toplantılar genelde sona eklenir, insort bu durumda ucuzdur
+        key = (meeting.created_at, -position)
+        for email in {meeting.organizer, *meeting.participants}:
+            bisect.insort(self._meetings_by_user_created.setdefault(email, []), key)
+    
+    def _rebuild_meeting_indexes(self):
+        """Ters indeksleri toplantı geçmişinden tek geçişte yeniden oluştur"""
+        self._meetings_by_participant = {}
+        self._meetings_by_organizer = {}
+        self._meetings_by_user_created = {}
+        for position, meeting in enumerate(self.meeting_history):
+            self._index_meeting(position, meeting)
+    
+    def _refresh_meeting_stats(self):
+        """Eksik veya geçmişle uyuşmayan profil sayaçlarını organizatör indeksinden yeniden hesapla"""
+        for email, profile in self.user_profiles.items():
+            positions = self._meetings_by_organizer.get(email, ())
+            if _meeting_stats_valid(profile.meeting_stats) and profile.meeting_stats['meeting_count'] == len(positions):
+                continue
+            profile.meeting_stats = _empty_meeting_stats()
+            for position in positions:
+                _add_meeting_stats(profile.meeting_stats, self.meeting_history[position])
+    
+    def _record_meeting_time(self, meeting: MeetingMemory):
+        """Toplantı saatini organizatör ve katılımcıların histogramlarına ekle"""
+        bucket = _time_bucket(meeting.time)
+        if bucket is None:
+            return
+        for email in {meeting.organizer, *meeting.participants}:
+            if email:
+                histogram = self.time_histograms.setdefault(email, [0] * TIME_BUCKETS_PER_DAY)
+                histogram[bucket] += 1
+    
+    def _rebuild_time_histograms(self):
+        """Histogramları toplantı geçmişinden tek geçişte yeniden oluştur"""
+        self.time_histograms = {}
+        for meeting in self.meeting_history:
+            self._record_meeting_time(meeting)
+    
+    def _time_histogram(self, email: str) -> List[int]:
+        """Kişinin toplantı saati histogramı - hiç toplantısı yoksa boş"""
+        return self.time_histograms.get(email, ())
+    
+    def time_preference_weights(self, organizer_email: Optional[str], participants: List[str],
+                                participant_weight: float = 0.5) -> List[float]:
+        """Organizatör + katılımcı histogramlarından 0-1 arası gün dilimi ağırlıkları"""
+        combined = [0.0] * TIME_BUCKETS_PER_DAY
+        
+        def add(histogram, weight):
+            for bucket, count in enumerate(histogram):
+                if count:
+                    combined[bucket] += weight * count
+        
+        if organizer_email:
+            add(self._time_histogram(organizer_email), 1.0)
+            # Profildeki tercih edilen saatler zayıf bir ön bilgi olarak eklenir
+            profile = self.user_profiles.get(organizer_email)
+            if profile:
+                for time_str in profile.preferred_meeting_times:
+                    bucket = _time_bucket(time_str)
+                    if bucket is not None:
+                        combined[bucket] += 1.0
+        for participant in participants:
+            if participant != organizer_email:
+                add(self._time_histogram(participant), participant_weight)
+        
+        peak = max(combined)
+        return [value / peak for value in combined] if peak else combined
+    
     def get_recent_meetings(self, user_email: str, days: int = 30) -> List[MeetingMemory]:
         """Son X gün içindeki toplantıları getir"""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         
-        recent_meetings = []
-        for meeting in self.meeting_history:
-            if (meeting.organizer == user_email or user_email in meeting.participants):
-                meeting_date = datetime.fromisoformat(meeting.created_at)
-                if meeting_date >= cutoff_date:
-                    recent_meetings.append(meeting)
-        
-        return sorted(recent_meetings, key=lambda m: m.created_at, reverse=True)
+        # Liste (created_at, -pozisyon) sıralı - sondan okumak yeniden eskiye, eşitlerde ekleme sırası verir
+        keys = self._meetings_by_user_created.get(user_email, [])
+        start = bisect.bisect_left(keys, (cutoff,))
+        return [self.meeting_history[-negative_position] for _, negative_position in reversed(keys[start:])]
     
     def get_similar_past_meetings(self, participants: List[str], organizer: str) -> List[MeetingMemory]:
         """Benzer geçmiş toplantıları bul"""
-        similar_meetings = []
-        
-        for meeting in self.meeting_history:
-            if meeting.organizer == organizer:
-                # Katılımcı benzerliği kontrol et
-                common_participants = set(participants) & set(meeting.participants)
-                if len(common_participants) > 0:
-                    similar_meetings.append(meeting)
+        # Katılımcı benzerliği: en az bir ortak katılımcısı olan toplantılar - kısa olan indeks taranır
+        wanted = set(participants)
+        participant_postings = [self._meetings_by_participant.get(participant, ()) for participant in wanted]
+        organizer_positions = self._meetings_by_organizer.get(organizer, ())
+        
+        if len(organizer_positions) <= sum(len(postings) for postings in participant_postings):
+            positions = [
+                position for position in organizer_positions
+                if not wanted.isdisjoint(self.meeting_history[position].participants)
+            ]
+        else:
+            positions = sorted(
+                position for position in set().union(*participant_postings)
+                if self.meeting_history[position].organizer == organizer
+            )
         
+        similar_meetings = [self.meeting_history[position] for position in positions]
         return sorted(similar_meetings, key=lambda m: m.created_at, reverse=True)[:5]
     
+    def _latest_meetings(self, limit: int) -> List[MeetingMemory]:
+        """Eklenme sırasına göre son toplantılar"""
+        return self.meeting_history[-limit:]
+    
     def get_user_stats(self, user_email: str) -> Dict[str, Any]:
         """Kullanıcı istatistiklerini getir"""
         profile = self.user_profiles.get(user_email)
@@ -294,7 +662,7 @@ class MemoryManager:
         if user_email in self.user_profiles:
             # Basit keyword matching ile benzer toplantıları bul
             request_lower = current_request.lower()
-            for meeting in self.meeting_history[-10:]:  # Son 10 toplantıya bak
+            for meeting in self._latest_meetings(10):  # Son 10 toplantıya bak
                 if meeting.organizer == user_email:
                     title_words = meeting.title.lower().split()
                     if any(word in request_lower for word in title_words):
@@ -334,38 +702,27 @@ class MemoryManager:
         return "\n".join(summary_parts)
     
     def analyze_user_patterns(self, user_email: str) -> Dict[str, Any]:
-        """Kullanıcı davranış paternlerini analiz et"""
-        if user_email not in self.user_profiles:
-            return {}
-        
-        user_meetings = [m for m in self.meeting_history if m.organizer == user_email]
-        
-        if not user_meetings:
+        """Kullanıcı davranış paternlerini profildeki artımlı sayaçlardan çıkar"""
+        profile = self.user_profiles.get(user_email)
+        if not profile or not profile.meeting_stats or not profile.meeting_stats['meeting_count']:
             return {}
+        stats = profile.meeting_stats
         
-        # En çok kullanılan süre
-        durations = [m.duration for m in user_meetings]
-        most_common_duration = max(set(durations), key=durations.count)
+        # En çok kullanılan süre / saat - eşitlikte ilk görülen kazanır
+        duration_counts = stats['duration_counts']
+        most_common_duration = (
+            json.loads(max(duration_counts.items(), key=lambda item: item[1])[0]) if duration_counts else None
+        )
+        time_counts = stats['time_counts']
+        most_common_time = max(time_counts.items(), key=lambda item: item[1])[0] if time_counts else None
         
         # En çok kullanılan katılımcılar
-        all_participants = []
-        for meeting in user_meetings:
-            all_participants.extend(meeting.participants)
-        
-        participant_counts = defaultdict(int)
-        for participant in all_participants:
-            participant_counts[participant] += 1
-        
-        top_participants = sorted(participant_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # En çok kullanılan gün/saat
-        meeting_times = [m.time for m in user_meetings if m.time]
-        most_common_time = max(set(meeting_times), key=meeting_times.count) if meeting_times else None
+        top_participants = heapq.nlargest(5, stats['participant_counts'].items(), key=lambda item: item[1])
         
         return {
             'most_common_duration': most_common_duration,
             'top_participants': [p[0] for p in top_participants],
             'most_common_time': most_common_time,
-            'total_meetings': len(user_meetings),
-            'average_duration': sum(durations) / len(durations) if durations else 60
-        }
\ No newline at end of file
+            'total_meetings': stats['meeting_count'],
+            'average_duration': stats['duration_sum'] / stats['duration_count'] if stats['duration_count'] else 60
+        }
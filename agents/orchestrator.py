@@ -12,11 +12,51 @@ from google.adk.agents import Agent
 import vertexai
 
 # Import tool functions
-from .calendar_analyst import check_calendar_availability, create_calendar_event
+from .calendar_analyst import (
+    check_calendar_availability, check_recurring_availability, create_calendar_event, create_calendar_events
+)
 from .memory_manager import MemoryManager
+from .sqlite_memory import SQLiteMemoryManager
+from .availability import (
+    WorkingHours, histogram_scorer, register_scoring_policy, set_default_scoring_policy, set_working_hours_provider
+)
+
+
+def create_memory_manager() -> MemoryManager:
+    """MEMORY_BACKEND'e göre hafıza yöneticisi oluştur (json veya sqlite)"""
+    if os.getenv('MEMORY_BACKEND', 'json').lower() == 'sqlite':
+        return SQLiteMemoryManager(os.getenv('MEMORY_DB_FILE', 'memory_data.db'))
+    return MemoryManager()
+
 
 # Global memory manager
-global_memory = MemoryManager()
+global_memory = create_memory_manager()
+
+
+def _personalized_scoring_policy(organizer_email: Optional[str] = None, participants: Optional[List[str]] = None, **_):
+    """Hafızadaki zaman histogramlarıyla kişiselleştirilmiş slot skoru"""
+    weights = global_memory.time_preference_weights(organizer_email, participants or [])
+    return histogram_scorer(weights)
+
+
+# Memory -> availability bağımlılığı döngüsel import olmasın diye kayıt burada yapılır
+register_scoring_policy('personalized', _personalized_scoring_policy)
+set_default_scoring_policy('personalized')
+
+
+def _profile_working_hours(email: str) -> Optional[WorkingHours]:
+    """Hafızadaki kullanıcı profilinden saat dilimi ve çalışma saatleri"""
+    profile = global_memory.user_profiles.get(email)
+    if profile is None:
+        return None
+    return WorkingHours(
+        timezone=profile.timezone,
+        start=profile.working_hours.get('start', '09:00'),
+        end=profile.working_hours.get('end', '18:00')
+    )
+
+
+set_working_hours_provider(_profile_working_hours)
 
 # Memory tool functions
 def save_conversation_to_memory(user_input: str, agent_response: str, meeting_details: dict, success: bool, meeting_id: Optional[str] = None, calendar_event_id: Optional[str] = None) -> dict:
@@ -30,22 +70,24 @@ def save_conversation_to_memory(user_input: str, agent_response: str, meeting_de
             meeting_details['calendar_event_id'] = calendar_event_id
             meeting_details['organizer'] = user_email
         
-        # Konuşmayı kaydet
-        global_memory.add_conversation_turn(
-            user_input=user_input,
-            agent_response=agent_response,
-            parsed_data=meeting_details,
-            success=success,
-            meeting_id=meeting_id
-        )
+        # Tüm değişiklikler tek journal yazımında kalıcı olsun
+        with global_memory.transaction():
+            # Konuşmayı kaydet
+            global_memory.add_conversation_turn(
+                user_input=user_input,
+                agent_response=agent_response,
+                parsed_data=meeting_details,
+                success=success,
+                meeting_id=meeting_id
+            )
         
-        # Eğer toplantı başarılı ise meeting history'e de ekle
-        if success and meeting_details.get('participants'):
-            meeting_id = global_memory.add_meeting_to_history(meeting_details)
+            # Eğer toplantı başarılı ise meeting history'e de ekle
+            if success and meeting_details.get('participants'):
+                meeting_id = global_memory.add_meeting_to_history(meeting_details)
             
-            # Frequent participants güncelle
-            for participant in meeting_details.get('participants', []):
-                global_memory.add_frequent_participant(user_email, participant)
+                # Frequent participants güncelle
+                for participant in meeting_details.get('participants', []):
+                    global_memory.add_frequent_participant(user_email, participant)
         
         return {
             'success': True,
@@ -144,6 +186,8 @@ GÖREVIN: End-to-end TAMAMEN OTOMATİK toplantı planlama.
    ⚠️ ÖNEMLİ: Eğer 'no_slots_available' true ise:
    "❌ Bu tarihte boş slot yok! Alternatif tarihler: [alternative_dates listesi]
    Başka bir tarih seçelim mi?" diye sor ve TOPLANTI OLUŞTURMA!
+   💡 alternative_dates zaten kontrol edildi - her tarihin boş saatleri
+   'alternative_slots' içinde, bu tarihler için TEKRAR sorgu yapma!
 
 5. 📅 create_calendar_event tool'unu kullan:
    - GERÇEK Google Calendar Event oluştur
@@ -179,6 +223,9 @@ GÖREVIN: End-to-end TAMAMEN OTOMATİK toplantı planlama.
    
 2. check_calendar_availability (GERÇEK müsaitlik kontrol)
 3. create_calendar_event (GERÇEK Calendar Event oluştur - otomatik davet gönderir)
+   - Birden çok toplantı (seri, mülakat döngüsü) için create_calendar_events kullan: tek istekte toplu oluşturur
+   - Tekrarlayan toplantı (haftalık, iki haftada bir) için önce check_recurring_availability(recurrence="FREQ=WEEKLY;COUNT=6")
+     ile tüm tekrarlarda ortak boş saati bul, sonra create_calendar_event'e 'recurrence' alanını ekle
 4. save_conversation_to_memory (Memory'e kaydet)
 
 ⚠️ ARTIK KULLANMA:
@@ -222,7 +269,9 @@ BAŞARI KRİTERLERİ:
 """,
         tools=[
             check_calendar_availability, 
+            check_recurring_availability,
             create_calendar_event, 
+            create_calendar_events,
             save_conversation_to_memory,
             get_user_memory_insights
         ]
@@ -235,7 +284,8 @@ class MeetingOrchestrator:
     
     def __init__(self):
         self.orchestrator_agent = create_orchestrator_agent()
-        self.memory_manager = MemoryManager()
+        # Aynı dosyaya yazan ikinci bir yönetici journal sıra numaralarını çakıştırır - global örnek paylaşılır
+        self.memory_manager = global_memory
         print("🧠 Memory Manager başlatıldı")
         
     def parse_meeting_request(self, request: str, user_email: str = None) -> dict:
@@ -425,35 +475,56 @@ class MeetingOrchestrator:
                 return {'success': False, 'error': 'Katılımcı e-posta adresi bulunamadı.'}
 
             # 1. Kullanıcının istediği spesifik zaman aralığını kontrol et
-            import datetime, pytz
-            from .calendar_analyst import oauth_service
-            turkey_tz = pytz.timezone('Europe/Istanbul')
+            import datetime
+            from .calendar_analyst import aquery_freebusy
+            from .availability import (
+                DEFAULT_WORKING_HOURS, get_timezone, get_working_hours, is_window_free, merge_busy_minutes,
+                nearest_free_slots
+            )
+            # Tarih/saat check_calendar_availability gibi organizatörün saat diliminde yorumlanır
+            working_hours = get_working_hours([organizer_email, *meeting_info['participants']])
+            organizer_hours = working_hours.pop(organizer_email, DEFAULT_WORKING_HOURS)
+            organizer_tz = get_timezone(organizer_hours.timezone)
             start_str = f"{meeting_info['date']} {meeting_info.get('start_time', '10:00')}"
-            requested_start = turkey_tz.localize(
+            requested_start = organizer_tz.localize(
                 datetime.datetime.strptime(start_str, '%Y-%m-%d %H:%M')
             )
             requested_end = requested_start + datetime.timedelta(minutes=meeting_info['duration'])
 
             print(f"🕒 İstenen zaman: {requested_start.strftime('%Y-%m-%d %H:%M')} - {requested_end.strftime('%H:%M')} ({meeting_info['duration']} dakika)")
 
-            fb_query = {
-                'timeMin': requested_start.isoformat(),
-                'timeMax': requested_end.isoformat(),
-                'timeZone': 'Europe/Istanbul',
-                'items': [{'id': email} for email in meeting_info['participants']]
-            }
-            fb_result = oauth_service.service.freebusy().query(body=fb_query).execute()
-            busy_times = any(
-                len(calendars.get('busy', [])) > 0 for calendars in fb_result.get('calendars', {}).values()
+            # Tüm günü tek sorguda al - hem istenen slot hem alternatifler bu sonuçtan hesaplanır
+            day_start = organizer_tz.localize(
+                datetime.datetime.strptime(meeting_info['date'], '%Y-%m-%d')
+            )
+            day_end = organizer_tz.localize(
+                datetime.datetime.strptime(meeting_info['date'], '%Y-%m-%d') + datetime.timedelta(days=1)
+            )
+            fb_calendars = await aquery_freebusy(
+                meeting_info['participants'], min(day_start, requested_start), max(day_end, requested_end),
+                organizer_email=organizer_email
             )
             
-            if busy_times:
-                # Takvim doluysa, kullanıcıdan yeni tarih/saat iste
+            if not is_window_free(merge_busy_minutes(fb_calendars), requested_start, requested_end):
+                # Takvim doluysa aynı günün (katılımcıların ortak çalışma saatlerindeki) en yakın boş slotlarını öner
+                alternative_slots = nearest_free_slots(
+                    fb_calendars, requested_start, meeting_info['duration'],
+                    working_hours=working_hours, organizer_hours=organizer_hours
+                )
+                error = (
+                    f"⚠️ Seçtiğin {requested_start.strftime('%Y-%m-%d %H:%M')} — "
+                    f"{requested_end.strftime('%H:%M')} arası dolu."
+                )
+                if alternative_slots:
+                    suggestions = ', '.join(f"{slot['start']}-{slot['end']}" for slot in alternative_slots)
+                    error += f" Aynı gün en yakın boş saatler: {suggestions}"
+                else:
+                    error += " Aynı gün boş saat yok, lütfen başka bir tarih belirt."
                 return {
                     'success': False,
-                    'error': (
-                        f"⚠️ Seçtiğin {requested_start.strftime('%Y-%m-%d %H:%M')} — "
-                        f"{requested_end.strftime('%H:%M')} arası dolu. Lütfen başka bir tarih veya saat belirt.")
+                    'error': error,
+                    'alternative_slots': alternative_slots,
+                    'meeting_details': meeting_info
                 }
 
             # 2. Önce kullanıcıya detayları göster - ONAY İSTE
@@ -465,7 +536,7 @@ class MeetingOrchestrator:
 📅 **Tarih**: {requested_start.strftime('%d %B %Y')} ({requested_start.strftime('%A')})
 🕒 **Saat**: {requested_start.strftime('%H:%M')} - {requested_end.strftime('%H:%M')}
 ⏱️ **Süre**: {meeting_info['duration']} dakika
-🌍 **Zaman Dilimi**: Europe/Istanbul
+🌍 **Zaman Dilimi**: {organizer_hours.timezone}
 📍 **Konum**: {meeting_info.get('location', 'Online')}
 
 ✅ **Bu bilgiler doğru mu? Toplantıyı oluşturayım mı?**
@@ -511,10 +582,10 @@ class MeetingOrchestrator:
         try:
             print("✅ Toplantı onaylandı - Oluşturuluyor...")
             
-            from .calendar_analyst import create_calendar_event
+            from .calendar_analyst import acreate_calendar_event
             
-            # Event oluştur
-            event_resp = create_calendar_event(confirmation_data)
+            # Event oluştur - event loop'u bloklamadan
+            event_resp = await acreate_calendar_event(confirmation_data)
             
             if event_resp.get('success'):
                 # Memory'e kaydet
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Calendar API Hız Sınırlayıcı - token bucket, uyarlanır hız ve jitter'lı üstel geri çekilme
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Google Calendar'ın kota aşımı için döndürdüğü 403 reason değerleri
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded'}
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """HTTP 429 veya kota reason'lı 403 mü"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+
+    content = getattr(error, 'content', b'') or b''
+    try:
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        errors = json.loads(content).get('error', {}).get('errors', [])
+        return any(item.get('reason') in RATE_LIMIT_REASONS for item in errors)
+    except (ValueError, AttributeError):
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+
+
+class TokenBucket:
+    """Uyarlanır token bucket - kota hatasında hız yarıya iner, başarılarla yavaşça toparlanır"""
+
+    def __init__(self, rate_per_second: float, burst: float, min_rate_per_second: Optional[float] = None):
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.min_rate = min_rate_per_second or rate_per_second / 10
+        self.capacity = max(burst, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Yeterli token birikene kadar bekle, beklenen süreyi döndür"""
+        # Kapasiteden büyük maliyetler (ör. batch) kapasite boyutunda parçalarla tam olarak düşülür
+        waited = 0.0
+        while tokens > 0:
+            part = min(tokens, self.capacity)
+            waited += self._acquire_part(part)
+            tokens -= part
+        return waited
+
+    def _acquire_part(self, tokens: float) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_rate_limited(self):
+        """Kota hatası - hızı yarıya indir ve biriken token'ları boşalt"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+    def on_success(self):
+        """Başarılı çağrı - hızı yapılandırılan üst sınıra doğru eklemeli olarak artır"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CalendarRateLimiter:
+    """Proje geneli + kullanıcı başına token bucket ve kota hatalarında yeniden deneme"""
+
+    def __init__(self, project_qps: float = 20, project_burst: float = 40,
+                 user_qps: float = 5, user_burst: float = 10,
+                 max_retries: int = 5, base_delay_seconds: float = 0.5, max_delay_seconds: float = 32):
+        self.project_bucket = TokenBucket(project_qps, project_burst)
+        self.user_qps = user_qps
+        self.user_burst = user_burst
+        self.max_retries = max_retries
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._user_buckets: Dict[str, TokenBucket] = {}
+        self._user_overrides: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._metrics = {
+            'calls': 0,
+            'throttled_calls': 0,
+            'throttle_wait_seconds': 0.0,
+            'rate_limited': 0,
+            'retries': 0,
+            'backoff_seconds': 0.0,
+            'failures': 0
+        }
+
+    def configure_user(self, user: str, qps: float, burst: Optional[float] = None):
+        """Belirli bir kullanıcı için farklı hız sınırı tanımla"""
+        with self._lock:
+            self._user_overrides[user] = (qps, burst or qps * 2)
+            self._user_buckets.pop(user, None)
+
+    def _user_bucket(self, user: Optional[str]) -> TokenBucket:
+        key = user or 'default'
+        with self._lock:
+            bucket = self._user_buckets.get(key)
+            if bucket is None:
+                qps, burst = self._user_overrides.get(key, (self.user_qps, self.user_burst))
+                bucket = self._user_buckets[key] = TokenBucket(qps, burst)
+            return bucket
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    def acquire(self, user: Optional[str], cost: float = 1):
+        """Proje ve kullanıcı bucket'larından token al (gerekirse bekle)"""
+        waited = self.project_bucket.acquire(cost) + self._user_bucket(user).acquire(cost)
+        with self._lock:
+            self._metrics['calls'] += 1
+            if waited > 0:
+                self._metrics['throttled_calls'] += 1
+                self._metrics['throttle_wait_seconds'] += waited
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter üstel geri çekilme süresi"""
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt)))
+
+    def on_rate_limited(self, user: Optional[str], attempt: int) -> Optional[float]:
+        """Kota hatasını kaydet, hızları düşür; yeniden denenecekse beklenecek süreyi döndür"""
+        self._count('rate_limited')
+        self.project_bucket.on_rate_limited()
+        self._user_bucket(user).on_rate_limited()
+        if attempt >= self.max_retries:
+            self._count('failures')
+            return None
+        delay = self.backoff_delay(attempt)
+        with self._lock:
+            self._metrics['retries'] += 1
+            self._metrics['backoff_seconds'] += delay
+        return delay
+
+    def on_success(self, user: Optional[str]):
+        self.project_bucket.on_success()
+        self._user_bucket(user).on_success()
+
+    def call(self, user: Optional[str], fn: Callable, cost: float = 1):
+        """fn'i hız sınırı altında çalıştır - kota hatalarında jitter'lı geri çekilme ile yeniden dene"""
+        attempt = 0
+        while True:
+            self.acquire(user, cost)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                delay = self.on_rate_limited(user, attempt)
+                if delay is None:
+                    raise
+                print(f"⏳ Calendar API kota sınırı - {delay:.2f}s sonra yeniden denenecek ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.on_success(user)
+            return result
+
+    def metrics(self) -> Dict:
+        """Sayaçlar ve anlık hızlar"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['user_rates'] = {user: bucket.rate for user, bucket in self._user_buckets.items()}
+        metrics['project_rate'] = self.project_bucket.rate
+        return metrics
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+SQLite Hafıza Deposu - büyük toplantı geçmişleri için indeksli MemoryManager backend'i
+"""
+
+import json
+import sqlite3
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from .memory_manager import (
+    MAX_CONVERSATION_TURNS, TIME_BUCKETS_PER_DAY, ConversationTurn, MeetingMemory, MemoryManager, UserProfile,
+    _add_meeting_stats, _empty_meeting_stats, _meeting_stats_valid, _time_bucket
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_id TEXT NOT NULL,
+    title TEXT,
+    participants TEXT NOT NULL,
+    organizer TEXT,
+    date TEXT,
+    time TEXT,
+    duration INTEGER,
+    status TEXT,
+    created_at TEXT NOT NULL,
+    calendar_event_id TEXT,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS meetings_organizer_created ON meetings (organizer, created_at);
+CREATE INDEX IF NOT EXISTS meetings_created ON meetings (created_at);
+CREATE TABLE IF NOT EXISTS meeting_participants (
+    meeting_rowid INTEGER NOT NULL REFERENCES meetings (id),
+    email TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (meeting_rowid, email)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS meeting_participants_email_created ON meeting_participants (email, created_at);
+"""
+
+_MEETING_COLUMNS = ('meeting_id', 'title', 'participants', 'organizer', 'date', 'time', 'duration',
+                    'status', 'created_at', 'calendar_event_id', 'notes')
+_SELECT_MEETING = f"SELECT m.id, {', '.join('m.' + column for column in _MEETING_COLUMNS)} FROM meetings m"
+
+
+def _row_to_meeting(row: sqlite3.Row) -> MeetingMemory:
+    data = {column: row[column] for column in _MEETING_COLUMNS}
+    data['participants'] = json.loads(data['participants'])
+    return MeetingMemory(**data)
+
+
+class SQLiteMemoryManager(MemoryManager):
+    """MemoryManager'ın SQLite (WAL) üzerinde çalışan sürümü - toplantılar belleğe yüklenmez, indeksle sorgulanır"""
+
+    def __init__(self, db_file: str = "memory_data.db", migrate_from: Optional[str] = "memory_data.json", **kwargs):
+        self.migrate_from = migrate_from
+        self._connection: Optional[sqlite3.Connection] = None
+        super().__init__(db_file, **kwargs)
+
+    def _load_memory(self):
+        """Veritabanını aç, gerekiyorsa JSON'dan taşı; yalnızca profilleri ve son konuşmaları yükle"""
+        # Timer thread'i de yazdığı için bağlantı paylaşılır, erişim _write_lock ile sıralanır
+        self._connection = sqlite3.connect(self.memory_file, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        if self._connection.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone() is None:
+            self._migrate_json()
+
+        self.user_profiles = {
+            row['user_id']: UserProfile(**json.loads(row['data']))
+            for row in self._connection.execute("SELECT user_id, data FROM profiles")
+        }
+        rows = self._connection.execute(
+            "SELECT data FROM turns ORDER BY id DESC LIMIT ?", (MAX_CONVERSATION_TURNS,)
+        ).fetchall()
+        self.conversation_history = [ConversationTurn(**json.loads(row['data'])) for row in reversed(rows)]
+        self.meeting_history = []
+
+        print("💾 Hafıza başarıyla yüklendi (SQLite)")
+
+    def _migrate_json(self):
+        """Eski JSON hafızasını (snapshot + journal) tek transaction'da veritabanına aktar - yalnızca bir kez"""
+        source = self.migrate_from
+        items = []
+        if source:
+            # Snapshot henüz yazılmamış olabilir (ilk sıkıştırmaya kadar her şey journal'dadır);
+            # MemoryManager ikisini de okur, hiçbiri yoksa boş döner
+            legacy = MemoryManager(source, flush_max_delay=0)
+            items = (
+                [('turn', turn) for turn in legacy.conversation_history]
+                + [('profile', profile) for profile in legacy.user_profiles.values()]
+                + [('meeting', meeting) for meeting in legacy.meeting_history]
+            )
+
+        with self._connection:
+            self._insert_records(items)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (source or '',)
+            )
+        if items:
+            print(f"💾 {source} SQLite'a taşındı ({len(items)} kayıt)")
+
+    def _insert_records(self, items: List[tuple]):
+        """Kayıtları açık transaction içinde tablolara yaz"""
+        for op, item in items:
+            if op == 'turn':
+                self._connection.execute(
+                    "INSERT INTO turns (timestamp, data) VALUES (?, ?)",
+                    (item.timestamp, json.dumps(asdict(item), ensure_ascii=False))
+                )
+            elif op == 'profile':
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO profiles (user_id, data) VALUES (?, ?)",
+                    (item.user_id, json.dumps(asdict(item), ensure_ascii=False))
+                )
+            elif op == 'meeting':
+                values = asdict(item)
+                values['participants'] = json.dumps(item.participants, ensure_ascii=False)
+                cursor = self._connection.execute(
+                    f"INSERT INTO meetings ({', '.join(_MEETING_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in _MEETING_COLUMNS)})",
+                    [values[column] for column in _MEETING_COLUMNS]
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO meeting_participants (meeting_rowid, email, created_at) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, email, item.created_at) for email in item.participants]
+                )
+
+        # JSON backend'i gibi yalnızca son konuşmalar tutulur
+        self._connection.execute(
+            "DELETE FROM turns WHERE id <= (SELECT MAX(id) FROM turns) - ?", (MAX_CONVERSATION_TURNS,)
+        )
+
+    def _write_records(self, items: List[tuple]):
+        """Bekleyen kayıtları tek SQLite transaction'ında yaz"""
+        try:
+            with self._connection:
+                self._insert_records(items)
+        except sqlite3.Error as e:
+            print(f"❌ Hafıza veritabanı yazma hatası: {e}")
+
+    def save_memory(self):
+        """Tüm profilleri ve bekleyen değişiklikleri veritabanına yaz"""
+        with self._write_lock:
+            # last_interaction güncellemeleri journal'a düşmez, tam kayıtta profillerle birlikte yazılır
+            for profile in self.user_profiles.values():
+                self._pending_profiles[profile.user_id] = profile
+                self._dirty_ops += 1
+            self.flush()
+            print("💾 Hafıza kaydedildi")
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        """Bekleyen yazmaları uygulayıp sorguyu çalıştır"""
+        with self._write_lock:
+            self.flush()
+            return self._connection.execute(sql, params).fetchall()
+
+    def _rebuild_time_histograms(self):
+        """Histogramlar kişi başına ilk ihtiyaçta veritabanından hesaplanır"""
+        self.time_histograms = {}
+
+    def _refresh_meeting_stats(self):
+        """Sayaçları eksik profiller için organizatör indeksinden hesapla - sonraki profil yazımında kalıcı olur"""
+        for email, profile in self.user_profiles.items():
+            if _meeting_stats_valid(profile.meeting_stats):
+                continue
+            profile.meeting_stats = _empty_meeting_stats()
+            for row in self._query(f"{_SELECT_MEETING} WHERE m.organizer = ? ORDER BY m.id", (email,)):
+                _add_meeting_stats(profile.meeting_stats, _row_to_meeting(row))
+
+    def _remember_meeting(self, meeting: MeetingMemory):
+        """Toplantı veritabanına journal üzerinden yazılır - yalnızca önbellekteki histogramlar güncellenir"""
+        bucket = _time_bucket(meeting.time)
+        if bucket is None:
+            return
+        for email in {meeting.organizer, *meeting.participants}:
+            histogram = self.time_histograms.get(email)
+            if histogram is not None:
+                histogram[bucket] += 1
+
+    def _time_histogram(self, email: str) -> List[int]:
+        """Kişinin histogramını organizatör ve katılımcı indekslerinden hesaplayıp önbelleğe al"""
+        histogram = self.time_histograms.get(email)
+        if histogram is not None:
+            return histogram
+
+        rows = self._query(
+            "SELECT time, COUNT(*) AS count FROM meetings WHERE id IN ("
+            " SELECT id FROM meetings WHERE organizer = ?"
+            " UNION SELECT meeting_rowid FROM meeting_participants WHERE email = ?"
+            ") GROUP BY time",
+            (email, email)
+        )
+        histogram = [0] * TIME_BUCKETS_PER_DAY
+        for row in rows:
+            bucket = _time_bucket(row['time'])
+            if bucket is not None:
+                histogram[bucket] += row['count']
+        self.time_histograms[email] = histogram
+        return histogram
+
+    def _latest_meetings(self, limit: int) -> List[MeetingMemory]:
+        """Eklenme sırasına göre son toplantılar"""
+        rows = self._query(f"{_SELECT_MEETING} ORDER BY m.id DESC LIMIT ?", (limit,))
+        return [_row_to_meeting(row) for row in reversed(rows)]
+
+    def get_recent_meetings(self, user_email: str, days: int = 30) -> List[MeetingMemory]:
+        """Son X gün içindeki toplantıları getir"""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        rows = self._query(
+            f"{_SELECT_MEETING} WHERE m.organizer = ? AND m.created_at >= ?"
+            f" UNION {_SELECT_MEETING} JOIN meeting_participants p ON p.meeting_rowid = m.id"
+            " WHERE p.email = ? AND p.created_at >= ?"
+            " ORDER BY created_at DESC, id",
+            (user_email, cutoff, user_email, cutoff)
+        )
+        return [_row_to_meeting(row) for row in rows]
+
+    def get_similar_past_meetings(self, participants: List[str], organizer: str) -> List[MeetingMemory]:
+        """Benzer geçmiş toplantıları bul"""
+        participants = list(dict.fromkeys(participants))
+        if not participants:
+            return []
+
+        placeholders = ', '.join('?' for _ in participants)
+        rows = self._query(
+            f"{_SELECT_MEETING} WHERE m.organizer = ? AND EXISTS ("
+            f" SELECT 1 FROM meeting_participants p WHERE p.meeting_rowid = m.id AND p.email IN ({placeholders})"
+            ") ORDER BY m.created_at DESC, m.id LIMIT 5",
+            (organizer, *participants)
+        )
+        return [_row_to_meeting(row) for row in rows]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+OAuth Token Deposu - atomik kayıt, process'ler arası kilit ve arka plan yenileyici
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+# fcntl yalnızca POSIX'te var - Windows'ta kilit process içi kalır
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+
+def _process_lock(path: str) -> threading.Lock:
+    with _process_locks_guard:
+        return _process_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def token_file_lock(token_file: str):
+    """Token dosyası için hem thread'ler hem de worker process'ler arası özel kilit"""
+    with _process_lock(token_file):
+        if fcntl is None:
+            yield
+            return
+        lock_dir = os.path.dirname(os.path.abspath(token_file))
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(f"{token_file}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def load_token(token_file: str):
+    """Kaydedilmiş credentials'ı yükle - dosya yoksa veya bozuksa None"""
+    if not os.path.exists(token_file):
+        return None
+    try:
+        with open(token_file, 'rb') as token:
+            return pickle.load(token)
+    except Exception as e:
+        print(f"⚠️ Token okunamadı ({token_file}): {e}")
+        return None
+
+
+def save_token_atomic(token_file: str, creds):
+    """Credentials'ı geçici dosyaya yazıp os.replace ile atomik olarak kaydet"""
+    token_dir = os.path.dirname(os.path.abspath(token_file))
+    os.makedirs(token_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=token_dir, prefix='.token-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as token:
+            pickle.dump(creds, token)
+            token.flush()
+            os.fsync(token.fileno())
+        os.replace(tmp_path, token_file)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_expiring(creds, margin_seconds: float) -> bool:
+    """Credentials geçersiz mi veya margin_seconds içinde dolacak mı"""
+    if not creds.valid:
+        return True
+    expiry = getattr(creds, 'expiry', None)
+    if expiry is None:
+        return False
+    return expiry - datetime.utcnow() <= timedelta(seconds=margin_seconds)
+
+
+class TokenRefresher:
+    """Token'ları süreleri dolmadan arka planda yenileyen daemon thread"""
+
+    def __init__(self, services_provider: Callable[[], List], margin_seconds: float = 600,
+                 interval_seconds: float = 60):
+        self._services_provider = services_provider
+        self.margin_seconds = margin_seconds
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Yenileyiciyi başlat (birden çok çağrı güvenli)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='token-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Yenileyiciyi durdur"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def refresh_all(self):
+        """Süresi yaklaşan tüm token'ları yenile - bir hata diğerlerini engellemez"""
+        for service in self._services_provider():
+            try:
+                service.refresh_if_expiring(self.margin_seconds)
+            except Exception as e:
+                print(f"⚠️ Arka plan token yenileme hatası ({service.token_file}): {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self.refresh_all()
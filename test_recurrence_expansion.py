@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script to check RRULE expansion used by recurring availability
+"""
+
+from datetime import datetime
+
+from agents.availability import expand_recurrence, get_timezone, is_finite_rrule
+
+
+def test_utc_until_is_accepted():
+    """Google requires a UTC UNTIL for timed events - it must expand like a local one"""
+    days = expand_recurrence('FREQ=WEEKLY;UNTIL=20261201T000000Z', datetime(2026, 11, 2))
+    assert [day.strftime('%Y-%m-%d') for day in days] == [
+        '2026-11-02', '2026-11-09', '2026-11-16', '2026-11-23', '2026-11-30'
+    ]
+
+
+def test_utc_until_uses_organizer_timezone():
+    """02:00Z on Nov 5 is still Nov 4 in New York, so Nov 5 is not an occurrence"""
+    days = expand_recurrence('RRULE:FREQ=DAILY;UNTIL=20261105T020000Z', datetime(2026, 11, 2),
+                             tz=get_timezone('America/New_York'))
+    assert [day.strftime('%Y-%m-%d') for day in days] == ['2026-11-02', '2026-11-03', '2026-11-04']
+
+
+def test_date_until_and_count():
+    assert len(expand_recurrence('FREQ=DAILY;UNTIL=20261104', datetime(2026, 11, 2))) == 3
+    assert len(expand_recurrence('FREQ=WEEKLY;COUNT=4', datetime(2026, 11, 2))) == 4
+
+
+def test_finite_rule_detection():
+    """Sonu olmayan kurallar MAX_RECURRENCE_OCCURRENCES ile kesilir, sonlu olanlar kesilmemeli"""
+    assert is_finite_rrule('FREQ=WEEKLY;COUNT=60')
+    assert is_finite_rrule('RRULE:FREQ=DAILY;UNTIL=20261105T020000Z')
+    assert not is_finite_rrule('FREQ=WEEKLY;BYDAY=MO,WE')
+
+
+if __name__ == "__main__":
+    test_utc_until_is_accepted()
+    test_utc_until_uses_organizer_timezone()
+    test_date_until_and_count()
+    test_finite_rule_detection()
+    print("✅ RRULE expansion tests passed")